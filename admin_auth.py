@@ -1,54 +1,100 @@
-import json
 import os
 
-def get_admin_credentials():
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                             'config', 'credentials.json')
-    try:
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                return json.load(f)
-    except:
-        pass
-    return {"admin123": "admin123"}
-
-def save_admin_credentials(username, password):
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                             'config', 'credentials.json')
-    os.makedirs(os.path.dirname(config_path), exist_ok=True)
-    
-    creds = {username: password}
-    with open(config_path, 'w') as f:
-        json.dump(creds, f, indent=2)
-
-def remember_admin_login(username, password):
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                             'config', 'remember.json')
-    os.makedirs(os.path.dirname(config_path), exist_ok=True)
-    
-    with open(config_path, 'w') as f:
-        json.dump({
-            "remembered_admin": username,
-            "remembered_password": password
-        }, f)
-
-def get_remembered_admin():
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                             'config', 'remember.json')
-    try:
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                data = json.load(f)
-                return {
-                    "username": data.get("remembered_admin"),
-                    "password": data.get("remembered_password")
-                }
-    except:
-        pass
-    return None
-
-def forget_admin_login():
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                             'config', 'remember.json')
-    if os.path.exists(config_path):
-        os.remove(config_path)
\ No newline at end of file
+from passwords import hash_password, verify_password, needs_rehash
+from record_store import RecordLog
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+# one record per admin account: {"username", "password", "role"}
+ADMINS_PATH = os.path.join(CONFIG_DIR, 'admins.jsonl')
+# the old single-admin {username: password} file, imported as a manager
+LEGACY_CREDENTIALS_PATH = os.path.join(CONFIG_DIR, 'credentials.json')
+
+# login accepted while no admin account exists at all
+DEFAULT_ADMIN = ("admin123", "admin123")
+
+ROLES = ("manager", "stock_clerk")
+ROLE_LABELS = {"manager": "Manager", "stock_clerk": "Stock Clerk"}
+ROLE_PERMISSIONS = {
+    "manager": {"edit_stock", "restock", "manage_orders", "manage_saves", "manage_admins"},
+    "stock_clerk": {"edit_stock", "restock"},
+}
+
+
+class AdminDirectory(RecordLog):
+    """Process-wide admin account store; see RecordLog."""
+
+    def __init__(self, path=ADMINS_PATH, legacy_path=LEGACY_CREDENTIALS_PATH):
+        super().__init__(path, legacy_path)
+
+    def legacy_records(self, data):
+        # hashed on the way in: credentials.json is deleted after the import and
+        # its few accounts should not carry plaintext into the log either
+        return [(username, {"password": hash_password(password), "role": "manager"})
+                for username, password in data.items()]
+
+
+admin_directory = AdminDirectory()
+
+def has_permission(role, permission):
+    return permission in ROLE_PERMISSIONS.get(role, ())
+
+def get_admin_role(username):
+    record = admin_directory.get(username)
+    return record.get("role") if record else None
+
+def list_admins():
+    return [(username, record.get("role")) for username, record in admin_directory.iter_records()]
+
+def verify_admin_login(username, password):
+    """Check an admin login; returns the account's role, or None."""
+    record = admin_directory.get(username)
+    if record is None and len(admin_directory) == 0 and username == DEFAULT_ADMIN[0]:
+        record = {"password": DEFAULT_ADMIN[1], "role": "manager"}
+    if record is None or not verify_password(password, record.get("password")):
+        return None
+
+    # upgrade plaintext or outdated hashes (and store the default account) while the password is at hand
+    if needs_rehash(record["password"]) or username not in admin_directory:
+        try:
+            admin_directory.add(username, dict(record, password=hash_password(password)))
+        except OSError as e:
+            print(f"[WARN] Could not upgrade admin password hash: {e}")
+    return record.get("role", "manager")
+
+def add_admin(username, password, role):
+    if not username or not password:
+        return False, "Username and password cannot be empty"
+    if role not in ROLES:
+        return False, f"Unknown role '{role}'"
+    if username in admin_directory:
+        return False, "Username already exists"
+    admin_directory.add(username, {"password": hash_password(password), "role": role})
+    return True, "Admin added"
+
+def remove_admin(username):
+    record = admin_directory.get(username)
+    if record is None:
+        return False, "No such admin"
+    if record.get("role") == "manager" and sum(1 for _, role in list_admins() if role == "manager") <= 1:
+        return False, "Cannot remove the last manager"
+    admin_directory.remove(username)
+    return True, "Admin removed"
+
+def change_admin_credentials(old_username, old_password, new_username, new_password):
+    role = verify_admin_login(old_username, old_password)
+    if role is None:
+        return False, "Current credentials are incorrect"
+    if not new_username or not new_password:
+        return False, "New credentials cannot be empty"
+    # Check if old and new credentials are the same
+    if old_username == new_username and old_password == new_password:
+        return False, "New credentials cannot be the same as old credentials"
+    if new_username != old_username and new_username in admin_directory:
+        return False, "Username already exists"
+
+    # one append: the new record, plus a tombstone for the old name when renaming
+    records = [(new_username, {"password": hash_password(new_password), "role": role})]
+    if new_username != old_username:
+        records.append((old_username, {"deleted": True}))
+    admin_directory.add_many(records)
+    return True, "Credentials updated successfully"
@@ -0,0 +1,158 @@
+import copy
+import os
+import threading
+import time
+
+from persistence import save_file_state, collect_garbage
+from stream_loader import LazyOrders
+
+# seconds between autosaves; 0 turns autosave off
+AUTOSAVE_INTERVAL = float(os.getenv('SISIT_AUTOSAVE_INTERVAL', '30'))
+
+# seconds between retention/garbage-collection passes over save_files/
+GC_INTERVAL = 3600
+
+
+class AutosaveWorker(threading.Thread):
+    """Writes the snapshots handed to submit() on its own thread, so encoding
+    and fsync never hold up the GUI, and applies the save retention policy
+    every GC_INTERVAL seconds.
+
+    State is copied on the GUI thread (see StateCopier) together with its
+    journal mark (see persistence.journal_mark) and this thread only writes
+    it. When several snapshots are submitted before one is written only the
+    newest is kept; a failed write is retried every interval until a newer
+    one replaces it. busy is true from submit() until the write is done.
+    """
+
+    def __init__(self, interval=AUTOSAVE_INTERVAL):
+        super().__init__(name='autosave', daemon=True)
+        self.interval = interval
+        self.last_saved = None
+        self.last_error = None
+        self._pending = None
+        self._writing = False
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._last_gc = None
+
+    def submit(self, state, journal_mark):
+        """Queue (inventory, orders, active_user, cart_items) for writing."""
+        with self._pending_lock:
+            self._pending = (state, journal_mark)
+        self._wake.set()
+
+    @property
+    def busy(self):
+        return self._pending is not None or self._writing
+
+    def run(self):
+        while not self._stopping:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.save_now()
+            if self._last_gc is None or time.monotonic() - self._last_gc >= GC_INTERVAL:
+                self.collect_now()
+
+    def save_now(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+            self._writing = pending is not None
+        if pending is None:
+            return
+        state, journal_mark = pending
+        try:
+            self.last_saved = save_file_state(*state, journal_mark=journal_mark)
+            self.last_error = None
+        except OSError as e:
+            with self._pending_lock:
+                if self._pending is None:
+                    self._pending = pending
+            self.last_error = e
+            print(f"[WARN] Autosave failed: {e}")
+        finally:
+            self._writing = False
+
+    def collect_now(self):
+        self._last_gc = time.monotonic()
+        try:
+            collect_garbage()
+        except OSError as e:
+            print(f"[WARN] Save cleanup failed: {e}")
+
+    def stop(self, flush=True):
+        self._stopping = True
+        self._wake.set()
+        if self.is_alive():
+            self.join()
+        if flush:
+            self.save_now()
+
+
+class StateCopier:
+    """Copies of the window's state for AutosaveWorker, taken on the GUI thread.
+
+    Only what the journal says changed since the last copy is copied again:
+    restocked products, the cart, orders appended at checkout. Everything
+    else is shared with the previous copy, which nothing mutates once it has
+    been handed to the worker. A section the window replaced outright (a
+    restored save) is copied whole.
+    """
+
+    def __init__(self):
+        self._sources = None  # (inventory, orders, cart_items) last copied from
+        self._copies = None
+        self._stock = set()
+        self._cart_changed = False
+        self._orders_rewritten = False
+
+    def note(self, op, fields):
+        """Record a journaled change so the next copy picks it up."""
+        if op == 'stock':
+            self._stock.add(fields.get('product'))
+        elif op in ('cart_add', 'cart_remove', 'checkout'):
+            self._cart_changed = True
+        elif op == 'orders_remove':
+            self._orders_rewritten = True
+
+    def copy(self, inventory, orders, active_user, cart_items):
+        sources = (inventory, orders, cart_items)
+        if self._sources is None:
+            replaced = (True, True, True)
+        else:
+            replaced = tuple(now is not then for now, then in zip(sources, self._sources))
+        old_inventory, old_orders, old_cart = self._copies or (None, None, None)
+
+        if replaced[0]:
+            inventory_copy = copy.deepcopy(inventory)
+        elif self._stock:
+            inventory_copy = dict(old_inventory)
+            for name in self._stock:
+                if name in inventory:
+                    inventory_copy[name] = copy.deepcopy(inventory[name])
+                else:
+                    inventory_copy.pop(name, None)
+        else:
+            inventory_copy = old_inventory
+
+        if isinstance(orders, LazyOrders) and not orders.modified:
+            # re-reads the history from disk; only the appended tail is copied
+            orders_copy = copy.deepcopy(orders)
+        elif replaced[1] or self._orders_rewritten or not isinstance(old_orders, list):
+            orders_copy = copy.deepcopy(orders)
+        elif len(orders) > len(old_orders):
+            orders_copy = old_orders + copy.deepcopy(orders[len(old_orders):])
+        else:
+            orders_copy = old_orders
+
+        if replaced[2] or self._cart_changed:
+            cart_copy = copy.deepcopy(cart_items)
+        else:
+            cart_copy = old_cart
+
+        self._sources = sources
+        self._copies = (inventory_copy, orders_copy, cart_copy)
+        self._stock = set()
+        self._cart_changed = self._orders_rewritten = False
+        return inventory_copy, orders_copy, copy.deepcopy(active_user), cart_copy
@@ -0,0 +1,77 @@
+"""Time building and scrolling the customer catalog page for a large catalog.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_catalog_grid.py --products 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication
+
+import catalog
+from catalog import ProductCatalog, get_catalog
+
+CATEGORIES = ("Shoulder Bag", "Sling Bag", "Tote Bag", "Coin Purse", "Saddle Bag")
+MATERIALS = ("Faux Leather", "Real Leather", "Leather", "Crocodile Texture")
+COLORS = ("Black", "Brown", "Tan", "Red", "Gray", "Blue", "Taupe", "Mocca")
+
+
+def synthetic_catalog(n_products, seed=1):
+    rng = random.Random(seed)
+    return ProductCatalog([{
+        "sku": f"P{i:06d}",
+        "name": f"P{i:06d}",
+        "category": rng.choice(CATEGORIES),
+        "material": rng.choice(MATERIALS),
+        "price": rng.randrange(50, 3000, 10),
+        "colors": rng.sample(COLORS, rng.randint(1, 4)),
+    } for i in range(n_products)])
+
+
+def run(n_products):
+    app = QApplication(sys.argv)
+    catalog._catalog = synthetic_catalog(n_products)
+    from main_window import MainWindow
+    from product_grid import ProductGridView
+
+    window = MainWindow(initial_view='mode_select')
+    window.inventory_data = get_catalog().initial_inventory()
+    window.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    window.switch_view('customer_catalog')
+    built = time.perf_counter() - start
+    app.processEvents()
+    shown = time.perf_counter() - start
+    print(f"{n_products:,} products: page built in {built * 1000:.0f} ms, first paint after {shown * 1000:.0f} ms")
+
+    # the facet index is built on idle ticks after the first paint
+    longest_tick = 0
+    while not get_catalog().build_facets().ready:
+        tick = time.perf_counter()
+        app.processEvents()
+        longest_tick = max(longest_tick, time.perf_counter() - tick)
+    print(f"facets indexed in the background after {(time.perf_counter() - start) * 1000:.0f} ms, "
+          f"longest idle tick {longest_tick * 1000:.0f} ms")
+
+    grid = window.findChild(ProductGridView)
+    bar = grid.verticalScrollBar()
+    start = time.perf_counter()
+    steps = 50
+    for step in range(steps):
+        bar.setValue(bar.maximum() * step // steps)
+        grid.viewport().repaint()
+    print(f"scroll repaint {(time.perf_counter() - start) / steps * 1000:.1f} ms per step")
+    window.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.products)
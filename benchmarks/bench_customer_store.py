@@ -0,0 +1,77 @@
+"""Measure customer store registration and lookup throughput at scale.
+
+    python benchmarks/bench_customer_store.py --customers 1000000 --ops 5000
+
+Password hashing is left out on purpose (see bench_password_kdf.py); this
+times the store itself: a login's account lookup and a registration's append.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from customer_auth import CustomerDirectory
+
+
+def write_store(path, n_customers):
+    with open(path, 'w') as f:
+        for i in range(n_customers):
+            f.write(json.dumps({"username": f"user{i}", "password": f"pw{i}", "name": "Customer",
+                                "address": f"Street {i}", "age": 18 + i % 60}) + "\n")
+
+
+def timed(fn, count):
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label, latencies):
+    latencies.sort()
+    total = sum(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if len(latencies) >= 100 else latencies[-1]
+    print(f"{label:<10} {len(latencies) / total:>10,.0f} ops/s   "
+          f"p50 {statistics.median(latencies) * 1e6:>8.1f} us   p99 {p99 * 1e6:>8.1f} us")
+
+
+def run(n_customers, n_ops, seed=1):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'customers.jsonl')
+        print(f"writing {n_customers:,} customers ...")
+        write_store(path, n_customers)
+
+        directory = CustomerDirectory(path, legacy_path=None)
+        start = time.perf_counter()
+        len(directory)
+        print(f"index build {time.perf_counter() - start:.2f} s, {os.path.getsize(path):,} bytes")
+
+        def login(i):
+            n = rng.randrange(n_customers)
+            assert directory.get(f"user{n}")["password"] == f"pw{n}"
+
+        def register(i):
+            assert f"new{i}" not in directory
+            directory.add(f"new{i}", {"password": "secret", "name": "New Customer", "address": "Somewhere", "age": 30})
+
+        report("login", timed(login, n_ops))
+        report("register", timed(register, n_ops))
+        report("login", timed(login, n_ops))
+        print(directory.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=1000000)
+    parser.add_argument("--ops", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.customers, args.ops)
@@ -0,0 +1,65 @@
+"""Time facet filtering and live facet counts over a large synthetic catalog.
+
+    python benchmarks/bench_facets.py --products 50000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import ProductCatalog, price_band
+from facets import FacetIndex, IN_STOCK
+
+CATEGORIES = ("Shoulder Bag", "Sling Bag", "Tote Bag", "Coin Purse", "Saddle Bag")
+MATERIALS = ("Faux Leather", "Real Leather", "Leather", "Crocodile Texture", "Canvas", "Suede")
+COLORS = ("Black", "Brown", "Tan", "Red", "Gray", "Blue", "Taupe", "Mocca", "Old Rose", "Lt. Green")
+
+SELECTIONS = (
+    {},
+    {"category": {"Tote Bag"}},
+    {"category": {"Tote Bag", "Sling Bag"}, "material": {"Real Leather"}},
+    {"material": {"Suede", "Canvas"}, "color": {"Red"}, "stock": {IN_STOCK}},
+    {"band": {"Under 100 php", "2000+ php"}, "stock": {IN_STOCK}},
+)
+
+
+def synthetic_catalog(n_products, seed=1):
+    rng = random.Random(seed)
+    return ProductCatalog([{
+        "sku": f"P{i:06d}", "name": f"P{i:06d}", "category": rng.choice(CATEGORIES),
+        "material": rng.choice(MATERIALS), "price": rng.randrange(50, 3000, 10),
+        "colors": rng.sample(COLORS, rng.randint(1, 4)),
+    } for i in range(n_products)])
+
+
+def run(n_products, repeat):
+    catalog = synthetic_catalog(n_products)
+    start = time.perf_counter()
+    facets = FacetIndex(catalog.query(), price_band)
+    facets.refresh_stock(lambda product: hash(product["sku"]) % 10 != 0)
+    print(f"built masks for {n_products:,} products in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for selections in SELECTIONS:
+        filtering, counting = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            visible = facets.select(facets.match(selections))
+            filtering.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            facets.counts(selections)
+            counting.append(time.perf_counter() - start)
+        label = " & ".join(f"{facet}={'|'.join(sorted(values))}" for facet, values in selections.items()) or "(none)"
+        print(f"{len(visible):>7,} shown  filter {statistics.median(filtering) * 1000:>6.2f} ms  "
+              f"counts {statistics.median(counting) * 1000:>6.2f} ms  {label}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.products, args.repeat)
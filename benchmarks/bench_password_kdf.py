@@ -0,0 +1,55 @@
+"""Time password hashing at different KDF costs, alone and across a process pool.
+
+    python benchmarks/bench_password_kdf.py --hashes 64
+
+Pick SISIT_SCRYPT_N / SISIT_PBKDF2_ITERATIONS so a single hash takes
+roughly 50-250 ms on the target machine.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import _pbkdf2, _scrypt
+
+SCRYPT_COSTS = [(2 ** 13, 8, 1), (2 ** 14, 8, 1), (2 ** 15, 8, 1), (2 ** 16, 8, 1)]
+PBKDF2_COSTS = [100000, 300000, 600000, 1200000]
+
+
+def scrypt_once(params):
+    _scrypt("correct horse battery staple", os.urandom(16), *params)
+
+
+def pbkdf2_once(iterations):
+    _pbkdf2("correct horse battery staple", os.urandom(16), iterations)
+
+
+def measure(label, fn, arg, n_hashes, pool):
+    start = time.perf_counter()
+    fn(arg)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    list(pool.map(fn, [arg] * n_hashes))
+    parallel = n_hashes / (time.perf_counter() - start)
+    print(f"{label:<28} {single * 1000:>9.1f} ms/hash {parallel:>10.1f} hashes/s pooled")
+
+
+def run(n_hashes, workers):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for n, r, p in SCRYPT_COSTS:
+            memory = 128 * n * r // (1024 * 1024)
+            measure(f"scrypt n=2^{n.bit_length() - 1} r={r} p={p} ({memory}MB)", scrypt_once, (n, r, p), n_hashes, pool)
+        for iterations in PBKDF2_COSTS:
+            measure(f"pbkdf2_sha256 {iterations:,}", pbkdf2_once, iterations, n_hashes, pool)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hashes", type=int, default=64, help="hashes per pooled run")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run(args.hashes, args.workers)
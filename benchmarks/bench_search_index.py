@@ -0,0 +1,61 @@
+"""Time catalog search queries against a large synthetic product index.
+
+    python benchmarks/bench_search_index.py --products 50000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex
+
+CATEGORIES = ("Shoulder Bag", "Sling Bag", "Tote Bag", "Coin Purse", "Saddle Bag")
+MATERIALS = ("Faux Leather", "Real Leather", "Leather", "Crocodile Texture", "Canvas", "Suede")
+COLORS = ("Black", "Brown", "Tan", "Red", "Gray", "Blue", "Taupe", "Mocca", "Old Rose", "Lt. Green")
+SYLLABLES = ("ca", "ra", "an", "hy", "ba", "bi", "ny", "or", "qu", "li", "me", "au", "ev", "av", "sa", "to")
+
+QUERIES = ("cara", "bag", "shoulder bag", "leather tan", "b", "crocodle", "faux brown", "zzzz", "sling blk")
+
+
+def product_name(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).upper()
+
+
+def synthetic_products(n_products, seed=1):
+    rng = random.Random(seed)
+    for i in range(n_products):
+        yield {"sku": f"P{i:06d}", "name": f"{product_name(rng)} {i}", "category": rng.choice(CATEGORIES),
+               "material": rng.choice(MATERIALS), "colors": rng.sample(COLORS, rng.randint(1, 4))}
+
+
+def run(n_products, repeat):
+    products = list(synthetic_products(n_products))
+    start = time.perf_counter()
+    index = SearchIndex(products)
+    print(f"indexed {n_products:,} products in {time.perf_counter() - start:.2f} s")
+
+    for query in QUERIES:
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = index.search(query)
+            latencies.append(time.perf_counter() - start)
+        print(f"{query!r:<16} {len(results):>7,} hits   p50 {statistics.median(latencies) * 1000:>7.2f} ms   "
+              f"max {max(latencies) * 1000:>7.2f} ms")
+
+    start = time.perf_counter()
+    for product in products[:1000]:
+        index.add(dict(product, name=product["name"] + " Renamed"))
+    print(f"1,000 incremental updates in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.products, args.repeat)
@@ -0,0 +1,90 @@
+"""Compare snapshot codecs: bytes on disk and save/load time.
+
+    python benchmarks/bench_snapshot_codecs.py --products 10000 --orders 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snapshot_codecs import CODECS, encode_state, decode_state
+
+CATEGORIES = ["Shoulder Bag", "Sling Bag", "Tote Bag", "Coin Purse", "Saddle Bag"]
+MATERIALS = ["Crocodile Texture", "Faux Leather", "Real Leather", "Leather"]
+COLORS = ["Brown", "Black", "Tan", "Red", "Gray", "Blue", "Taupe", "Mocca", "Camel", "Beige"]
+
+
+def make_state(n_products, n_orders, seed=1):
+    rng = random.Random(seed)
+    names = [f"SKU{i:05d}" for i in range(n_products)]
+    inventory = {name: {"type": rng.choice(CATEGORIES), "quantity": rng.randint(0, 50)} for name in names}
+    buyers = [{"username": f"user{i}", "name": f"Customer {i}", "address": f"Street {i}", "age": rng.randint(18, 80)}
+              for i in range(max(n_orders // 20, 1))]
+    orders = []
+    for _ in range(n_orders):
+        name = rng.choice(names)
+        qty = rng.randint(1, 5)
+        price = rng.choice((50, 70, 280, 300, 350, 680, 1000, 1200, 1800))
+        orders.append({
+            "buyer": rng.choice(buyers),
+            "product": name,
+            "category": inventory[name]["type"],
+            "material": rng.choice(MATERIALS),
+            "quantity": qty,
+            "color": rng.choice(COLORS),
+            "price": price,
+            "total": price * qty,
+        })
+    return {"inventory": inventory, "orders": orders, "active_user": None, "cart_items": [],
+            "saved_at": "20250101_000000"}
+
+
+# shapes the binary codec packs specially; each must come back unchanged
+ROUND_TRIP_CASES = [
+    {"cart_items": [{}, {}]},
+    {"orders": [{}, {}, {}], "inventory": {}},
+    {"rows": [{"a": 1}, {"a": 2}], "mixed": [{"a": 1}, {"b": 2}], "empty": [[], []]},
+    {"nested": [[{}], [{}, {}]], "none": [None, None], "strings": ["", ""]},
+]
+
+
+def check_round_trips():
+    for codec in CODECS:
+        for case in ROUND_TRIP_CASES:
+            loaded = decode_state(encode_state(case, codec))
+            assert loaded == case, f"{codec} changed {case!r} into {loaded!r}"
+
+
+def run(n_products, n_orders):
+    check_round_trips()
+    print(f"generating {n_products} products / {n_orders} orders ...")
+    state = make_state(n_products, n_orders)
+    print(f"{'codec':<10} {'bytes':>14} {'save s':>9} {'load s':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in CODECS:
+            path = os.path.join(tmp, f"state.{codec}")
+            start = time.perf_counter()
+            data = encode_state(state, codec)
+            with open(path, 'wb') as f:
+                f.write(data)
+            save_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with open(path, 'rb') as f:
+                loaded = decode_state(f.read())
+            load_time = time.perf_counter() - start
+
+            assert len(loaded["orders"]) == n_orders
+            print(f"{codec:<10} {os.path.getsize(path):>14,} {save_time:>9.2f} {load_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=1000000)
+    args = parser.parse_args()
+    run(args.products, args.orders)
@@ -0,0 +1,199 @@
+import json
+import os
+from collections import defaultdict
+
+from facets import FacetIndex
+from search_index import SearchIndex
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+# every product the shop sells or stocks, keyed by SKU
+CATALOG_PATH = os.path.join(CONFIG_DIR, 'catalog.json')
+
+# lower bounds (php) of the price bands used for filtering
+PRICE_BANDS = (0, 100, 500, 1000, 2000)
+
+# starting stock for products the catalog gives no initial_stock
+DEFAULT_STOCK = 50
+
+
+def price_band(price):
+    """Label of the band a price falls into, e.g. "100 - 499 php"."""
+    for low, high in zip(PRICE_BANDS, PRICE_BANDS[1:]):
+        if price < high:
+            return f"Under {high} php" if low == 0 else f"{low} - {high - 1} php"
+    return f"{PRICE_BANDS[-1]}+ php"
+
+
+def _product(record):
+    price = record.get("price", 0)
+    low, high = (price, price) if isinstance(price, (int, float)) else tuple(price)
+    return {
+        "sku": record["sku"].upper(),
+        "name": record.get("name", record["sku"]),
+        "category": record.get("category", ""),
+        "material": record.get("material", ""),
+        "colors": list(record.get("colors", [])),
+        # the displayed (and cart) price: a number, or "low - high" for a range
+        "price": low if low == high else f"{low} - {high}",
+        "price_min": low,
+        "price_max": high,
+        "initial_stock": record.get("initial_stock", DEFAULT_STOCK),
+        # untracked products (made to order) have no stock count
+        "tracked": record.get("tracked", True),
+        # unlisted products are stocked but not shown in the customer catalog
+        "listed": record.get("listed", True),
+    }
+
+
+class ProductCatalog:
+    """Products keyed by canonical SKU, with the category, material, color
+    and price band indexes the views filter on built once at load."""
+
+    def __init__(self, records):
+        self.products = {}
+        self._aliases = {}
+        self._indexes = {field: defaultdict(set) for field in ("category", "material", "color", "band")}
+        self._search = None
+        self._facets = None
+        for record in records:
+            self._insert(_product(record))
+        self._refresh_listing()
+
+    def _index_keys(self, product):
+        yield "category", product["category"]
+        yield "material", product["material"]
+        for color in product["colors"]:
+            yield "color", color
+        yield "band", price_band(product["price_min"])
+
+    def _insert(self, product):
+        sku = product["sku"]
+        self.products[sku] = product
+        self._aliases[sku.lower()] = sku
+        self._aliases.setdefault(product["name"].lower(), sku)
+        if product["listed"]:
+            for field, value in self._index_keys(product):
+                self._indexes[field][value].add(sku)
+            if self._search is not None:
+                self._search.add(product)
+
+    def _refresh_listing(self):
+        # bit positions follow the listing, so facet masks are rebuilt on next use
+        self._facets = None
+        self._listed = [sku for sku, product in self.products.items() if product["listed"]]
+        self._categories = list(dict.fromkeys(self.products[sku]["category"] for sku in self._listed))
+
+    def _discard(self, sku):
+        product = self.products[sku]
+        for alias in [alias for alias, target in self._aliases.items() if target == sku]:
+            del self._aliases[alias]
+        for field, value in self._index_keys(product):
+            skus = self._indexes[field].get(value)
+            if skus is not None:
+                skus.discard(sku)
+                if not skus:
+                    del self._indexes[field][value]
+
+    def add(self, record):
+        """Add or replace one product, updating every index in place. A
+        replaced product keeps its place in the catalog order."""
+        product = _product(record)
+        sku = product["sku"]
+        if sku in self.products:
+            self._discard(sku)
+            if not product["listed"] and self._search is not None:
+                self._search.remove(sku)
+        self._insert(product)
+        self._refresh_listing()
+        return product
+
+    def remove(self, sku):
+        if sku not in self.products:
+            return
+        self._discard(sku)
+        del self.products[sku]
+        if self._search is not None:
+            self._search.remove(sku)
+        self._refresh_listing()
+
+    @property
+    def facets(self):
+        """Facet bitmasks over listed products, built on first use."""
+        facets = self.build_facets()
+        facets.finish()
+        return facets
+
+    def build_facets(self, chunk=None):
+        """The facet index, possibly still unbuilt: with chunk set a new index
+        is left for the caller to finish with build_step() on idle ticks."""
+        if self._facets is None:
+            self._facets = FacetIndex((self.products[sku] for sku in self._listed), price_band, chunk)
+        return self._facets
+
+    @property
+    def search_index(self):
+        """Token search over listed products, built on first use."""
+        if self._search is None:
+            self._search = SearchIndex(self.products[sku] for sku in self._listed)
+        return self._search
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)["products"])
+
+    def __len__(self):
+        return len(self.products)
+
+    def canonical_sku(self, name):
+        """The SKU for a product name in any casing; unknown names come back unchanged."""
+        return self._aliases.get(str(name).lower(), name)
+
+    def get(self, name):
+        return self.products.get(self.canonical_sku(name))
+
+    def is_tracked(self, name):
+        product = self.get(name)
+        return product is None or product["tracked"]
+
+    def categories(self):
+        return list(self._categories)
+
+    def materials(self):
+        return sorted(self._indexes["material"])
+
+    def colors(self):
+        return sorted(self._indexes["color"])
+
+    def price_bands(self):
+        labels = [price_band(low) for low in PRICE_BANDS]
+        return [label for label in labels if label in self._indexes["band"]]
+
+    def query(self, categories=None, materials=None, colors=None, bands=None):
+        """Listed products matching every given filter, in catalog order. Each
+        filter is a collection of accepted values; empty or None accepts all."""
+        matches = None
+        for field, values in (("category", categories), ("material", materials),
+                              ("color", colors), ("band", bands)):
+            if not values:
+                continue
+            index = self._indexes[field]
+            skus = set().union(*(index.get(value, ()) for value in values))
+            matches = skus if matches is None else matches & skus
+        if matches is None:
+            return [self.products[sku] for sku in self._listed]
+        return [self.products[sku] for sku in self._listed if sku in matches]
+
+    def initial_inventory(self):
+        return {sku: {"type": product["category"], "quantity": product["initial_stock"]}
+                for sku, product in self.products.items() if product["tracked"]}
+
+
+_catalog = None
+
+def get_catalog():
+    """The catalog loaded from CATALOG_PATH, read once per process."""
+    global _catalog
+    if _catalog is None:
+        _catalog = ProductCatalog.load()
+    return _catalog
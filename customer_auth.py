@@ -1,63 +1,82 @@
-import json
 import os
 
+from passwords import hash_password, verify_password, needs_rehash
+from record_store import RecordLog
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+# one JSON record per line; a later record for the same username replaces earlier ones
+CUSTOMERS_PATH = os.path.join(CONFIG_DIR, 'customers.jsonl')
+# the old single-document store, imported once when no log exists yet
+LEGACY_CUSTOMERS_PATH = os.path.join(CONFIG_DIR, 'customers.json')
+
+
+class CustomerDirectory(RecordLog):
+    """Process-wide customer store; see RecordLog."""
+
+    def __init__(self, path=CUSTOMERS_PATH, legacy_path=LEGACY_CUSTOMERS_PATH):
+        super().__init__(path, legacy_path)
+
+
+customer_directory = CustomerDirectory()
+
 def get_customers_data():
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                             'config', 'customers.json')
-    try:
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                return json.load(f)
-    except:
-        pass
-    return {}
+    return customer_directory.all()
 
-def save_customer(username, password, name, address, age):
-    customers = get_customers_data()
-    
+def validate_customer(username, name, age):
+    """Registration rules shared with bulk import. Returns (error, age as int)."""
     # username already exists
-    if username in customers:
-        return False, "Username already exists"
-    
+    if username in customer_directory:
+        return "Username already exists", None
+
     # Validate name
     if not name or any(char.isdigit() for char in name):
-        return False, "Name cannot contain numbers"
-    
+        return "Name cannot contain numbers", None
+
     # Validate age
     try:
         age_val = int(age)
         if age_val <= 0 or age_val > 110:
-            return False, "Age must be between 1 and 110"
+            return "Age must be between 1 and 110", None
     except (ValueError, TypeError):
-        return False, "Age must be a valid number"
-    
-    # Save customer
-    customers[username] = {
-        "password": password,
+        return "Age must be a valid number", None
+
+    return None, age_val
+
+def save_customer(username, password, name, address, age):
+    error, age_val = validate_customer(username, name, age)
+    if error:
+        return False, error
+
+    # Save customer; the name is checked again as the record is written, since
+    # another registration may have taken it while the password was hashed
+    added = customer_directory.add_if_absent(username, {
+        "password": hash_password(password),
         "name": name,
         "address": address,
         "age": age_val
-    }
-    
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                             'config', 'customers.json')
-    os.makedirs(os.path.dirname(config_path), exist_ok=True)
-    
-    with open(config_path, 'w') as f:
-        json.dump(customers, f, indent=2)
-    
+    })
+    if not added:
+        return False, "Username already exists"
+
     return True, "Registration successful"
 
 def verify_customer_login(username, password):
-    customers = get_customers_data()
-    
-    if username not in customers:
+    customer = customer_directory.get(username)
+
+    if customer is None:
         return False, None, "Invalid username or password"
-    
-    if customers[username]["password"] != password:
+
+    if not verify_password(password, customer.get("password")):
         return False, None, "Invalid username or password"
-    
-    profile = customers[username].copy()
+
+    # upgrade plaintext or outdated hashes while the password is at hand
+    if needs_rehash(customer["password"]):
+        try:
+            customer_directory.add(username, dict(customer, password=hash_password(password)))
+        except OSError as e:
+            print(f"[WARN] Could not upgrade password hash for {username}: {e}")
+
+    profile = customer.copy()
     profile.pop("password", None)
-    
+
     return True, profile, "Login successful"
@@ -1,14 +1,19 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QPushButton, QScrollArea, QLineEdit,
-    QGroupBox, QHBoxLayout, QSpinBox, QMessageBox, QComboBox, QCheckBox, QGridLayout, QTableWidget, QTableWidgetItem, 
+    QWidget, QVBoxLayout, QLabel, QPushButton, QLineEdit,
+    QGroupBox, QHBoxLayout, QMessageBox, QComboBox, QCheckBox, QGridLayout, QTableWidget, QTableWidgetItem, 
     QHeaderView, QGraphicsDropShadowEffect
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPixmap, QColor
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QColor
 import os
 from ui_views import FeedbackDialog
-from ui_components import CollapsablePanel
+from ui_components import CollapsablePanel, run_when_idle
 from feedback_email import send_feedback_email
+from catalog import get_catalog
+from product_grid import ProductListModel, ProductGridView
+from search_index import SEARCH_DEBOUNCE_MS
+from facets import IN_STOCK, BUILD_CHUNK
+from pixmap_cache import cached_pixmap
 
 
 def create_customer_page(parent=None):
@@ -24,14 +29,10 @@ def create_customer_page(parent=None):
     base_dir = os.path.dirname(os.path.abspath(__file__))
     icon_path = os.path.join(base_dir, "assets", "login_icon.png")
 
-    pixmap = QPixmap(icon_path)
+    pixmap = cached_pixmap(icon_path, 80)
 
     if not pixmap.isNull():
-        icon_label.setPixmap(
-            pixmap.scaled(80, 80,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation)
-        )
+        icon_label.setPixmap(pixmap)
     layout.addWidget(icon_label, alignment=Qt.AlignmentFlag.AlignCenter)
 
     header_layout = QGridLayout()
@@ -53,7 +54,7 @@ def create_customer_page(parent=None):
         dialog.exec()
     
     menu_panel.add_menu_item("Feedback", show_feedback)
-    menu_panel.add_menu_item("Log Out", lambda: parent.switch_view('customer'))
+    menu_panel.add_menu_item("Log Out", lambda: parent.log_out('customer'))
 
     menu_btn = QPushButton("☰")
     menu_btn.setFixedSize(30, 30)
@@ -108,7 +109,7 @@ def create_customer_page(parent=None):
     top_filter_layout = QHBoxLayout()
 
     search_bar = QLineEdit()
-    search_bar.setPlaceholderText("Search by category (e.g. Shoulder Bag)...")
+    search_bar.setPlaceholderText("Search by name, category, material or color (e.g. Shoulder Bag)...")
     search_bar.setStyleSheet("padding: 5px; border: 1px solid #ccc; border-radius: 5px;")
     top_filter_layout.addWidget(search_bar)
 
@@ -138,96 +139,44 @@ def create_customer_page(parent=None):
     material_layout = QHBoxLayout(material_group_box)
     filter_grid.addWidget(material_group_box, 0, 1)
 
-    layout.addWidget(filter_container)
+    price_group_box = QGroupBox("Filter by Price")
+    price_layout = QHBoxLayout(price_group_box)
+    filter_grid.addWidget(price_group_box, 1, 0)
 
-    # Scroll area
-    scroll = QScrollArea()
-    scroll.setWidgetResizable(True)
-    content = QWidget()
-    content_layout = QVBoxLayout(content)
-    content_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-    content_layout.setSpacing(20)
+    availability_group_box = QGroupBox("Filter by Color and Availability")
+    availability_layout = QHBoxLayout(availability_group_box)
+    filter_grid.addWidget(availability_group_box, 1, 1)
+
+    layout.addWidget(filter_container)
 
     # "No results" message
     no_results_label = QLabel("No products match your search.")
     no_results_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
     no_results_label.setStyleSheet("font-size: 16px; color: #888; margin-top: 50px;")
-    content_layout.addWidget(no_results_label)
+    layout.addWidget(no_results_label)
     no_results_label.hide()  # Hide it initially
 
-    # Product Catalog
-    catalog = {
-        "Shoulder Bag": [
-            {"price": 300, "material": "Crocodile Texture", "name": "CARA", "colors": ["Blue/Pink", "Red/Blue", "Pink/Brown", "Brown/Pink", "Pink/Blue", "Tan/Beige", "Beige/Black", "Blue/Tan", "Black/Red", "Brown/Beige"]},
-            {"price": 350, "material": "Faux Leather", "name": "ANA", "colors": ["Brown", "Taupe", "Lt. Green", "Dark Brown"]},
-            {"price": 350, "material": "Faux Leather", "name": "HYE", "colors": ["Gray", "Choco Brown", "Black"]},
-            {"price": 300, "material": "Faux Leather", "name": "BABY", "colors": ["Brown"]},
-            {"price": 280, "material": "Faux Leather", "name": "BIA", "colors": ["Lt. Green"]},
-        ],
-        "Sling Bag": [
-            {"price": 1000, "material": "Real Leather", "name": "NYA", "colors": ["Tan", "Black"]},
-            {"price": 680, "material": "Leather", "name": "ORA", "colors": ["Tan", "Black"]},
-        ],
-        "Tote Bag": [
-            {"price": 1200, "material": "Real Leather", "name": "QUI", "colors": ["Black"]},
-            {"price": 1800, "material": "Real Leather", "name": "LIA", "colors": ["Brown", "Black", "Tan"]},
-        ],
-        "Coin Purse": [
-            {"price": 70, "material": "Faux Leather", "name": "MEG", "colors": ["Brown", "Mocca", "Red", "Tan", "R. Blue", "D. Brown"]},
-            {"price": 70, "material": "Faux Leather", "name": "AURA", "colors": ["Tan", "Brown G", "Camel", "Taupe", "Red", "Black", "Brown", "Gray"]},
-            {"price": 50, "material": "Faux Leather", "name": "EVA", "colors": ["Blue", "Tan", "Old Rose", "Mocca", "Gray", "Red", "Taupe", "Brown", "Camel", "Black"]},
-            {"price": 50, "material": "Faux Leather", "name": "AVA", "colors": ["Brown", "Tan", "Red", "Black", "Old Rose", "Mocca", "Taupe", "Beige", "Gray", "Blue", "Lt. Green"]},
-        ],
-        "Saddle Bag": [
-            {"price": "1800", "material": "Faux Leather", "name": "STANDARD", "colors": ["Standard"]},
-            {"price": "5500 - 6000", "material": "Leather", "name": "CUSTOMIZED", "colors": ["Customizable"]},
-        ],
-    }
+    catalog = get_catalog()
 
-    product_widgets = []
-    all_materials = set()
-    
-    category_checkboxes = []
-    material_checkboxes = []
-
-    for category, items in catalog.items():
-        # --- Category Section Widget ---
-        category_section_widget = QWidget()
-        category_section_layout = QVBoxLayout(category_section_widget)
-        category_section_layout.setContentsMargins(0, 0, 0, 0)
-        category_section_layout.setSpacing(5)
-
-        section_label = QLabel(f"{category}")
-        section_label.setStyleSheet("font-size: 20px; font-weight: bold; color: #222; margin-top: 10px;")
-        category_section_layout.addWidget(section_label, alignment=Qt.AlignmentFlag.AlignCenter)
-
-        # --- Horizontal Scroll Area for Products ---
-        h_scroll = QScrollArea()
-        h_scroll.setWidgetResizable(True)
-        h_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        h_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        h_scroll.setFixedHeight(300) # Adjust height to fit cards + shadow
-
-        scroll_content = QWidget()
-        h_layout = QHBoxLayout(scroll_content)
-        h_layout.setSpacing(15)
-        
-        for item in items:
-            all_materials.add(item["material"])
-            card = create_product_card(item, category, parent) 
-            h_layout.addWidget(card)
-            parent.product_card_map[item['name']] = card
-
-        h_scroll.setWidget(scroll_content)
-        category_section_layout.addWidget(h_scroll)
-        content_layout.addWidget(category_section_widget)
-        product_widgets.append({'widget': category_section_widget, 'type': 'section', 'category': category, 'data': items})
+    # indexed on idle ticks once the page is up; filtering earlier finishes it on the spot
+    facets = catalog.build_facets(BUILD_CHUNK)
+    # facet -> its checkboxes; each box keeps its facet value, as its text carries a count
+    facet_checkboxes = {facet: [] for facet in ('category', 'material', 'band', 'stock')}
+
+    # one virtualized grid for every product; cards are painted, not built
+    product_model = ProductListModel(parent, catalog.query(), widget)
+    parent.product_model = product_model
+    product_grid = ProductGridView(product_model, widget)
+    product_grid.delegate.add_requested.connect(
+        lambda product, color, qty: add_to_cart(parent, product, color, qty, widget))
+    layout.addWidget(product_grid, 1)
 
     # Initial update of cart count
     parent.update_cart_count()
 
-    for category_name in catalog.keys():
-        cb = QCheckBox(category_name)
+    def add_facet_checkbox(facet, value, facet_layout):
+        cb = QCheckBox(value)
+        cb.facet_value = value
         cb.setStyleSheet("""
             QCheckBox::indicator {
                 width: 15px;
@@ -240,276 +189,192 @@ def create_customer_page(parent=None):
                 border: 1px solid #222222;
             }
         """)
-        category_layout.addWidget(cb)
-        category_checkboxes.append(cb)
+        facet_layout.addWidget(cb)
+        facet_checkboxes[facet].append(cb)
 
-    # Populate material checkboxes
-    for material_name in sorted(list(all_materials)):
-        cb = QCheckBox(material_name)
-        cb.setStyleSheet("""
-            QCheckBox::indicator {
-                width: 15px;
-                height: 15px;
-                border: 1px solid #888;
-                border-radius: 3px;
-            }
-            QCheckBox::indicator:checked {
-                background-color: #222222;
-                border: 1px solid #222222;
-            }
-        """)
-        material_layout.addWidget(cb)
-        material_checkboxes.append(cb)
+    for category_name in catalog.categories():
+        add_facet_checkbox('category', category_name, category_layout)
+    for material_name in catalog.materials():
+        add_facet_checkbox('material', material_name, material_layout)
+    for band in catalog.price_bands():
+        add_facet_checkbox('band', band, price_layout)
 
-    content_layout.addStretch(1)
-    scroll.setWidget(content)
-    layout.addWidget(scroll)
+    color_box = QComboBox()
+    color_box.addItem("Any color", None)
+    for color in catalog.colors():
+        color_box.addItem(color, color)
+    availability_layout.addWidget(color_box)
+    add_facet_checkbox('stock', IN_STOCK, availability_layout)
+
+    filter_state = {'selections': {}, 'base': None, 'indexed': False}
+
+    def sync_stock():
+        # only tracked products that have run out drop out of "In Stock"
+        inv = getattr(parent, "inventory_data", {})
+        facets.set_sold_out(sku for sku, info in inv.items()
+                            if info.get("quantity") == 0 and catalog.is_tracked(sku))
+
+    def finish_facets():
+        if filter_state['indexed']:
+            return
+        facets.finish()
+        sync_stock()
+        filter_state['indexed'] = True
+        update_facet_counts()
+
+    def update_facet_counts():
+        # counts appear once the idle-time index is complete
+        if not filter_state['indexed']:
+            return
+        counts = facets.counts(filter_state['selections'], filter_state['base'])
+        for facet, boxes in facet_checkboxes.items():
+            for cb in boxes:
+                cb.setText(f"{cb.facet_value} ({counts[facet].get(cb.facet_value, 0)})")
+        for i in range(1, color_box.count()):
+            color = color_box.itemData(i)
+            color_box.setItemText(i, f"{color} ({counts['color'].get(color, 0)})")
 
     def update_product_view():
-        search_text = search_bar.text().lower()
-        
-        checked_categories = {cb.text() for cb in category_checkboxes if cb.isChecked()}
-        checked_materials = {cb.text() for cb in material_checkboxes if cb.isChecked()}
-
-        visible_product_categories = set()
-
-        for item in product_widgets:
-            is_visible = False
-            category_name = (item.get('category') or '').lower()
-
-            category_filter_ok = not checked_categories or item['category'] in checked_categories
-            if not category_filter_ok:
-                item['widget'].hide()
-                continue
-
-            if search_text and search_text in category_name:
-                is_visible = True
-                visible_product_categories.add(item['category'])
-            else:
-
-                for product_data in item['data']:
-                    name_match = search_text in product_data['name'].lower() if search_text else True
-                    material_match = not checked_materials or any(product_data['material'] == mat for mat in checked_materials)
-                    if name_match and material_match:
-                        is_visible = True
-                        visible_product_categories.add(item['category'])
-                        break
-
-            if is_visible:
-                item['widget'].show()
-            else:
-                item['widget'].hide()
-
-        if not visible_product_categories:
+        search_timer.stop()
+        finish_facets()
+        selections = {facet: {cb.facet_value for cb in boxes if cb.isChecked()}
+                      for facet, boxes in facet_checkboxes.items()}
+        selections['color'] = {color_box.currentData()} if color_box.currentData() else set()
+
+        # ranked matches, best first; None when the search box is empty
+        ranked = catalog.search_index.search(search_bar.text())
+        base = None if ranked is None else facets.mask_of(ranked)
+        visible = facets.select(facets.match(selections, base), ranked)
+        product_model.set_products(visible)
+        filter_state.update(selections=selections, base=base)
+        update_facet_counts()
+
+        if not visible:
             no_results_label.show()
         else:
             no_results_label.hide()
 
-    search_bar.textChanged.connect(update_product_view)
+    def on_stock_changed(sku):
+        product = catalog.products.get(sku)
+        # before indexing ends, finish_facets reads all stock in one go
+        if product is not None and filter_state['indexed']:
+            facets.set_in_stock(sku, product_model.stock(product) != 0)
+            update_facet_counts()
+
+    product_model.stock_changed.connect(on_stock_changed)
+    run_when_idle(widget, facets.build_step, finish_facets)
+
+    # search once typing pauses rather than on every keystroke
+    search_timer = QTimer(widget)
+    search_timer.setSingleShot(True)
+    search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+    search_timer.timeout.connect(update_product_view)
+    search_bar.textChanged.connect(search_timer.start)
+    search_bar.returnPressed.connect(update_product_view)
     
-    for cb in category_checkboxes:
-        cb.stateChanged.connect(update_product_view)
-    
-    for cb in material_checkboxes:
+    all_checkboxes = [cb for boxes in facet_checkboxes.values() for cb in boxes]
+    for cb in all_checkboxes:
         cb.stateChanged.connect(update_product_view)
+    color_box.currentIndexChanged.connect(update_product_view)
     
     def clear_checkbox_filters():
 
-        for cb in category_checkboxes + material_checkboxes:
+        for cb in all_checkboxes + [color_box]:
             cb.blockSignals(True)
 
-        for cb in category_checkboxes + material_checkboxes:
+        for cb in all_checkboxes:
             cb.setChecked(False)
+        color_box.setCurrentIndex(0)
 
-        for cb in category_checkboxes + material_checkboxes:
+        for cb in all_checkboxes + [color_box]:
             cb.blockSignals(False)
         update_product_view()
     clear_filters_btn.clicked.connect(clear_checkbox_filters)
 
     cart_button.clicked.connect(lambda: parent.switch_view('shopping_cart'))
 
-    return widget
-
-
-def create_product_card(product, category, main_window):
-
-    card = QGroupBox()
-    card.product_name = product['name']
-    card.product_material = product['material']
-    card.setFixedWidth(220)
-    card.setStyleSheet("""
-        QGroupBox {
-            border: 1px solid #e0e0e0; border-radius: 8px;
-            background: #fafafa;
-        }
-        QGroupBox:hover {
-            border-color: #0078d7;
-        }
-    """)
-
-    shadow = QGraphicsDropShadowEffect()
-    shadow.setBlurRadius(15)
-    shadow.setXOffset(0)
-    shadow.setYOffset(2)
-    shadow.setColor(Qt.GlobalColor.gray)
-    card.setGraphicsEffect(shadow)
-
-    card_layout = QVBoxLayout(card)
-    card_layout.setContentsMargins(10, 10, 10, 10)
-    card_layout.setSpacing(10)
-    card_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-
-    # Images
-    image_label = QLabel()
-    image_label.setFixedSize(100, 100)
-    image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    def refresh_view():
+        # the cart or an admin may have moved stock, or loaded a save, while the page was hidden
+        if filter_state['indexed']:
+            sync_stock()
+        if filter_state['selections'].get('stock'):
+            update_product_view()
+        else:
+            product_model.refresh()
+            update_facet_counts()
+        parent.update_cart_count()
+    widget.refresh_view = refresh_view
+
+    def release_view():
+        if parent.product_model is product_model:
+            parent.product_model = None
+        if parent.cart_count_label is cart_count_label:
+            parent.cart_count_label = None
+    widget.release_view = release_view
 
-    def find_image(name):
-        variants = [name, name.lower(), name.upper(), name.title()]
-        exts = ['.jpg', '.png', '.jpeg']
-        for v in variants:
-            for e in exts:
-                p = os.path.join(base_dir, 'assets', f"{v}{e}")
-                if os.path.exists(p):
-                    return p
-        return None
+    return widget
 
-    image_path = find_image(product['name'])
-    pixmap = QPixmap(image_path) if image_path else QPixmap()
 
-    if not pixmap.isNull():
-        image_label.setPixmap(pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-    else:
-        # helpful debug code for errors
-        print(f"[WARN] Image not found for product '{product['name']}' — looked for variants and extensions in assets/")
-        image_label.setText("Image\nNot Found")
-        image_label.setStyleSheet("""
-        QLabel {
-            background-color: #e0e0e0;
-            border: 1px dashed #cccccc;
-            border-radius: 5px;
-            color: #888888;
-        }
-        """)
+def add_to_cart(main_window, product, color, qty, parent_widget=None):
+    """Put qty of product in the cart, taking tracked stock out of the inventory."""
+    total = calculate_total(product['price'], qty)
+    category = product['category']
 
-    card_layout.addWidget(image_label, alignment=Qt.AlignmentFlag.AlignCenter)
+    inv = getattr(main_window, "inventory_data", {})
+    product_name = product['sku']
 
-    inv = main_window.inventory_data
-    stock_text = ""
-    # look up stock
-    if product["name"] in inv and "Customized" not in product["name"]:
-        stock_left = inv[product["name"]]["quantity"]
-        stock_text = f"  —  {stock_left} left"
-        if stock_left == 0:
-            stock_text = "  —  Out of Stock"
+    if product_name in inv and product['tracked']:
+        current_stock = inv[product_name]["quantity"]
+        if qty > current_stock:
+            QMessageBox.warning(
+                parent_widget,
+                "Insufficient Stock",
+                f"Only {current_stock} left in stock for {product_name}!"
+            )
+            return False
+        # reduce stock
+        inv[product_name]["quantity"] -= qty
+        main_window.record_change("stock", product=product_name, quantity=inv[product_name]["quantity"])
+        # Update the product card's display immediately
+        main_window.update_product_card_display(product_name)
+
+    # Stack cart items if same product/category/material/color
+    stacked = False
+    for item in main_window.cart_items:
+        if (item["product"] == product_name and item["category"] == category and item["material"] == product["material"] and item["color"] == color):
+            item["quantity"] += qty
+            item["total"] = calculate_total(product['price'], item["quantity"])
+            stacked = True
+            break
+    cart_line = {
+        "buyer": main_window.active_user,
+        "product": product_name,
+        "category": category,
+        "material": product["material"],
+        "quantity": qty,
+        "color": color,
+        "price": product['price'],
+        "total": total
+    }
+    if not stacked:
+        main_window.cart_items.append(dict(cart_line))
+        main_window.record_change("cart_add", item=cart_line)
     else:
-        stock_text = "  —  Customizable"
-    card.name_label = QLabel(f"{product['material']}: {product['name']}{stock_text}")
-    card.name_label.setStyleSheet("font-size: 14px; font-weight: bold; color: #333;")
-    card.name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-    card.name_label.setWordWrap(True)
-    card_layout.addWidget(card.name_label)
-
-    price_label = QLabel(f"{product['price']} php")
-    price_label.setStyleSheet("font-size: 14px; font-weight: bold; color: #222;")
-    price_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-    card_layout.addWidget(price_label)
-
-    # QOL
-    controls_layout = QHBoxLayout()
-    controls_layout.setSpacing(10)
+        main_window.record_change("cart_add", item=cart_line, line_total=item["total"])
 
-    color_box = QComboBox()
-    color_box.addItems(product["colors"])
-    controls_layout.addWidget(color_box)
-
-    qty_spin = QSpinBox()
-    qty_spin.setRange(1, 99)  # Minimum is 1, can't order 0
-    qty_spin.setValue(1)
-    qty_spin.setMinimum(1)  # Double ensure minimum is 1
-    qty_spin.setFixedWidth(60)
-    controls_layout.addWidget(qty_spin)
-    card_layout.addLayout(controls_layout)
+    # Update the cart count display
+    main_window.update_cart_count()
 
-    card_layout.addStretch(1)
-
-    card.buy_btn = QPushButton("Add to Cart")
-    card.buy_btn.setStyleSheet("""
-        QPushButton {
-            background: #28a745; color: white;
-            border: none; padding: 6px 12px; border-radius: 5px;
-        }
-        QPushButton:hover { background: #218838; }
-    """)
-    card_layout.addWidget(card.buy_btn)
-
-    def buy_action():
-        qty = qty_spin.value()
-        color = color_box.currentText()
-        total = calculate_total(product['price'], qty)
-        
-        inv = getattr(main_window, "inventory_data", {})
-        product_name = product['name']
-
-        if product_name in inv and "Customized" not in product_name:
-            current_stock = inv[product_name]["quantity"]
-            if qty > current_stock:
-                QMessageBox.warning(
-                    card,
-                    "Insufficient Stock",
-                    f"Only {current_stock} left in stock for {product_name}!"
-                )
-                return
-            # reduce stock
-            inv[product_name]["quantity"] -= qty
-            # Update the product card's display immediately
-            main_window.update_product_card_display(product_name)
-
-        # Stack cart items if same product/category/material/color
-        stacked = False
-        for item in main_window.cart_items:
-            if (item["product"] == product_name and item["category"] == category and item["material"] == product["material"] and item["color"] == color):
-                item["quantity"] += qty
-                item["total"] = calculate_total(product['price'], item["quantity"])
-                stacked = True
-                break
-        if not stacked:
-            main_window.cart_items.append({
-                "buyer": main_window.active_user,
-                "product": product_name,
-                "category": category,
-                "material": product["material"],
-                "quantity": qty,
-                "color": color,
-                "price": product['price'],
-                "total": total
-            })
-
-        # Update the cart count display
-        main_window.update_cart_count()
-
-        QMessageBox.information(
-            card,
-            "Added to Cart",
-            f"You added {qty} × {product_name} to your cart.\n\n"
-            f"Material: {product['material']}\n"
-            f"Color: {color}\n"
-            f"Price: {product['price']} php each\n\n"
-            f"Total: {total} php"
-        )
-
-    # Connect the signal
-    card.buy_btn.clicked.connect(buy_action)
-
-    # Initial check for out of stock to disable button
-    if product["name"] in inv and "Customized" not in product["name"] and inv[product["name"]]["quantity"] == 0:
-        card.buy_btn.setEnabled(False)
-        card.buy_btn.setText("Out of Stock")
-
-    return card
+    QMessageBox.information(
+        parent_widget,
+        "Added to Cart",
+        f"You added {qty} × {product_name} to your cart.\n\n"
+        f"Material: {product['material']}\n"
+        f"Color: {color}\n"
+        f"Price: {product['price']} php each\n\n"
+        f"Total: {total} php"
+    )
+    return True
 
 
 def calculate_total(price, qty):
@@ -602,14 +467,19 @@ def create_cart_view(parent=None):
             if reply == QMessageBox.StandardButton.Yes:
                 # Restore stock (only for trackable items)
                 inv = getattr(parent, "inventory_data", {})
-                product_name = item_to_remove.get('product')
-                if product_name in inv and "Customized" not in product_name:
+                product_name = get_catalog().canonical_sku(item_to_remove.get('product'))
+                if product_name in inv and get_catalog().is_tracked(product_name):
                     inv[product_name]["quantity"] += item_to_remove.get('quantity', 0)
+                    parent.record_change("stock", product=product_name, quantity=inv[product_name]["quantity"])
+                    parent.update_product_card_display(product_name)
 
                 # Remove from cart
                 parent.cart_items.remove(item_to_remove)
+                parent.record_change("cart_remove", item=item_to_remove)
+                parent.update_cart_count()
                 
                 refresh_cart_table()
+                update_checkout_button()
 
         return handler
 
@@ -631,13 +501,14 @@ def create_cart_view(parent=None):
     button_layout.addWidget(back_btn)
 
     checkout_btn = QPushButton("Checkout")
-    checkout_btn.setStyleSheet("""
+    checkout_style = """
         QPushButton {
             background: #28a745; color: white; border: none;
             padding: 8px 16px; border-radius: 5px; font-size: 14px;
         }
         QPushButton:hover { background: #218838; }
-    """)
+    """
+    checkout_btn.setStyleSheet(checkout_style)
     button_layout.addWidget(checkout_btn)
     layout.addLayout(button_layout)
 
@@ -650,6 +521,7 @@ def create_cart_view(parent=None):
         parent.orders.extend(parent.cart_items)
         # Clear the cart
         parent.cart_items.clear()
+        parent.record_change("checkout")
 
         QMessageBox.information(
             widget,
@@ -663,8 +535,18 @@ def create_cart_view(parent=None):
     checkout_btn.clicked.connect(handle_checkout)
 
     # If cart is empty, disable checkout
-    if not getattr(parent, 'cart_items', []):
-        checkout_btn.setEnabled(False)
-        checkout_btn.setStyleSheet("background-color: #ccc; color: #666; border: none; padding: 8px 16px; border-radius: 5px; font-size: 14px;")
+    def update_checkout_button():
+        if getattr(parent, 'cart_items', []):
+            checkout_btn.setEnabled(True)
+            checkout_btn.setStyleSheet(checkout_style)
+        else:
+            checkout_btn.setEnabled(False)
+            checkout_btn.setStyleSheet("background-color: #ccc; color: #666; border: none; padding: 8px 16px; border-radius: 5px; font-size: 14px;")
+    update_checkout_button()
+
+    def refresh_view():
+        refresh_cart_table()
+        update_checkout_button()
+    widget.refresh_view = refresh_view
 
     return widget
\ No newline at end of file
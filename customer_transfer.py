@@ -0,0 +1,131 @@
+"""Bulk customer import and export, as CSV or JSON lines.
+
+    python customer_transfer.py import customers.csv [--workers N]
+    python customer_transfer.py export customers.jsonl
+
+Rows need username, password, name, address and age. Imports are
+validated with the registration rules and committed in one append;
+exports stream the store and may be read back in with import.
+"""
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from customer_auth import customer_directory, validate_customer
+from passwords import hash_password, is_hashed
+
+FIELDS = ("username", "password", "name", "address", "age")
+
+
+def detect_format(path):
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def iter_rows(path, fmt=None):
+    """Yield (line number, row dict) from a CSV or JSONL file, one row at a time.
+    Rows that cannot be parsed come out as (line number, error message)."""
+    fmt = fmt or detect_format(path)
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_num, f"Invalid JSON: {e}"
+                continue
+            yield line_num, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+def validate_rows(rows):
+    """Check rows against the registration rules. Yields (line number,
+    username, record or None, error or None)."""
+    seen = set()
+    for line_num, row in rows:
+        if isinstance(row, str):
+            yield line_num, None, None, row
+            continue
+        username = str(row.get("username") or "").strip()
+        password = str(row.get("password") or "")
+        name = str(row.get("name") or "").strip()
+        if not username or not password:
+            yield line_num, username, None, "Username and password are required"
+            continue
+        if username in seen:
+            yield line_num, username, None, "Username appears more than once in this file"
+            continue
+        error, age = validate_customer(username, name, row.get("age"))
+        if error:
+            yield line_num, username, None, error
+            continue
+        seen.add(username)
+        record = {"password": password, "name": name, "address": str(row.get("address") or "").strip(), "age": age}
+        yield line_num, username, record, None
+
+
+def import_customers(path, fmt=None, workers=None):
+    """Import every valid row in one append. Returns (imported, errors) where
+    errors is a list of (line number, username, message)."""
+    accepted, errors = [], []
+    for line_num, username, record, error in validate_rows(iter_rows(path, fmt)):
+        if error:
+            errors.append((line_num, username, error))
+        else:
+            accepted.append((username, record))
+
+    plaintext = [record for _, record in accepted if not is_hashed(record["password"])]
+    if plaintext:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hashes = pool.map(hash_password, [record["password"] for record in plaintext], chunksize=32)
+            for record, hashed in zip(plaintext, hashes):
+                record["password"] = hashed
+
+    customer_directory.add_many(accepted)
+    return len(accepted), errors
+
+
+def export_customers(path, fmt=None):
+    """Write every customer (with password hashes) to path. Returns the count."""
+    fmt = fmt or detect_format(path)
+    count = 0
+    tmp_path = path + '.tmp'
+    if fmt == 'csv':
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for username, record in customer_directory.iter_records():
+                writer.writerow([username] + [record.get(field, "") for field in FIELDS[1:]])
+                count += 1
+    else:
+        # store lines are already export rows; copy them without re-encoding
+        with open(tmp_path, 'wb') as f:
+            for _, line in customer_directory.iter_lines():
+                f.write(line)
+                count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default=None,
+                        help="default: from the file extension")
+    parser.add_argument("--workers", type=int, default=None, help="password hashing processes (default: one per core)")
+    args = parser.parse_args()
+
+    if args.action == "export":
+        print(f"exported {export_customers(args.path, args.format)} customers to {args.path}")
+    else:
+        imported, errors = import_customers(args.path, args.format, args.workers)
+        for line_num, username, error in errors:
+            print(f"line {line_num}: {username or '-'}: {error}")
+        print(f"imported {imported} customers, {len(errors)} rows rejected")
@@ -0,0 +1,132 @@
+from functools import reduce
+from itertools import compress
+from operator import or_
+
+FACETS = ("category", "material", "color", "band", "stock")
+IN_STOCK = "In Stock"
+# products indexed per build_step() when a build is spread over idle ticks
+BUILD_CHUNK = 2000
+
+
+class FacetIndex:
+    """One int bitmask per facet value over a fixed list of products (bit i
+    is product i). Filtering is OR within a facet and AND across facets,
+    and match counts are popcounts, so neither touches products one by one."""
+
+    def __init__(self, products, price_band, chunk=None):
+        """With chunk set, nothing is indexed yet: build_step() indexes that
+        many products per call, so the work can be spread over idle ticks."""
+        self.products = []
+        self.all = 0
+        self._bit = {}
+        self._pending = self._build(products, price_band, chunk)
+        if chunk is None:
+            self.finish()
+
+    def _build(self, products, price_band, chunk):
+        self.products = list(products)
+        self.all = (1 << len(self.products)) - 1
+        chunk = chunk or max(len(self.products), 1)
+        yield
+        bits = {facet: {} for facet in FACETS}
+        for start in range(0, len(self.products), chunk):
+            for i, product in enumerate(self.products[start:start + chunk], start):
+                self._bit[product['sku']] = i
+                bits['category'].setdefault(product['category'], []).append(i)
+                bits['material'].setdefault(product['material'], []).append(i)
+                for color in product['colors']:
+                    bits['color'].setdefault(color, []).append(i)
+                bits['band'].setdefault(price_band(product['price_min']), []).append(i)
+            yield
+        masks = {}
+        for facet, values in bits.items():
+            masks[facet] = {}
+            for value, value_bits in values.items():
+                masks[facet][value] = self._mask(value_bits)
+                yield
+        self._masks = masks
+        # every product counts as in stock until refresh_stock is given the inventory
+        self._masks['stock'] = {IN_STOCK: self.all}
+
+    @property
+    def ready(self):
+        return self._pending is None
+
+    def build_step(self):
+        """Index the next chunk; False once the index is complete."""
+        if self._pending is None:
+            return False
+        try:
+            next(self._pending)
+        except StopIteration:
+            self._pending = None
+            return False
+        return True
+
+    def finish(self):
+        while self.build_step():
+            pass
+
+    def __len__(self):
+        return len(self.products)
+
+    def _mask(self, bits):
+        # set the bits as characters of a binary string; far cheaper than OR-ing in one at a time
+        size = len(self.products)
+        digits = bytearray(b'0') * size
+        for bit in bits:
+            digits[size - 1 - bit] = 49
+        return int(digits, 2) if size else 0
+
+    def values(self, facet):
+        return list(self._masks[facet])
+
+    def mask_of(self, skus):
+        bit = self._bit
+        return self._mask(bit[sku] for sku in skus if sku in bit)
+
+    def refresh_stock(self, in_stock):
+        """Recompute the in-stock mask; in_stock(product) says whether a product can be bought."""
+        self._masks['stock'][IN_STOCK] = self._mask(i for i, product in enumerate(self.products) if in_stock(product))
+
+    def set_sold_out(self, skus):
+        """Like refresh_stock, given just the SKUs that cannot be bought;
+        cheap when few products are sold out."""
+        self._masks['stock'][IN_STOCK] = self.all & ~self.mask_of(skus)
+
+    def set_in_stock(self, sku, in_stock):
+        bit = self._bit.get(sku)
+        if bit is None:
+            return
+        mask = self._masks['stock'][IN_STOCK]
+        self._masks['stock'][IN_STOCK] = mask | (1 << bit) if in_stock else mask & ~(1 << bit)
+
+    def match(self, selections, base=None, skip=None):
+        """Mask of products matching selections, {facet: accepted values};
+        empty facets accept everything. base narrows the result further,
+        e.g. to search hits, and skip leaves one facet out."""
+        mask = self.all if base is None else base
+        for facet, values in selections.items():
+            if facet == skip or not values:
+                continue
+            masks = self._masks[facet]
+            mask &= reduce(or_, (masks.get(value, 0) for value in values), 0)
+        return mask
+
+    def counts(self, selections, base=None):
+        """{facet: {value: matches}}. Each facet's counts ignore that
+        facet's own selection, so they show what ticking a value adds."""
+        counts = {}
+        for facet, masks in self._masks.items():
+            others = self.match(selections, base, skip=facet)
+            counts[facet] = {value: (others & mask).bit_count() for value, mask in masks.items()}
+        return counts
+
+    def select(self, mask, ranked=None):
+        """Products in mask, in catalog order, or in the order of the ranked SKUs."""
+        # bin() gives the most significant bit first; reverse so byte i is bit i
+        flags = bin(mask)[:1:-1].encode('ascii').ljust(len(self.products), b'0').replace(b'0', b'\0')
+        if ranked is None:
+            return list(compress(self.products, flags))
+        bit, products = self._bit, self.products
+        return [products[bit[sku]] for sku in ranked if sku in bit and flags[bit[sku]]]
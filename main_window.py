@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 
 from ui_components import CollapsablePanel, create_menu_button
 from ui_views import (create_admin_login_widget, create_customer_login_widget, create_inventory_widget,
@@ -7,6 +7,16 @@ from ui_views import (create_admin_login_widget, create_customer_login_widget, c
 )
 from customer_page import create_customer_page, create_cart_view
 from startup_views import create_startup_splash, create_mode_select_view
+from persistence import (append_journal, load_file_state, save_file_state, journal_mark, use_sqlite,
+                         start_garbage_collection, JOURNAL_COMPACT_EVERY)
+from autosave import AutosaveWorker, StateCopier, AUTOSAVE_INTERVAL
+import sessions
+from admin_auth import get_admin_role
+from catalog import get_catalog
+from view_pool import ViewPool, release
+
+# login views that are skipped while their role has a valid session
+SESSION_VIEWS = {'customer': 'customer_catalog', 'admin': 'inventory'}
 
 
 class MainWindow(QMainWindow):
@@ -15,29 +25,19 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Sisit: Inventory Listing System")
         self.resize(1200, 650)
 
-        self.active_user = None
-        self.orders = []
-        self.cart_items = []
-        self.product_card_map = {}
+        # pick up where the last session left off: the SQLite store as it
+        # stands, or the journal's base snapshot plus a replay of what was
+        # journaled since; the catalog defaults only on a first run
+        state = load_file_state(lazy_orders=True) or {}
+        self.active_user = state.get('active_user')
+        self.orders = state.get('orders', [])
+        self.cart_items = state.get('cart_items', [])
+        # the catalog grid's model, set while a customer page exists
+        self.product_model = None
+        # role -> session token; remembered admin sessions resume after a restart
+        self.session_tokens = {role: sessions.find(role) for role in SESSION_VIEWS}
         self.cart_count_label = None
-        self.inventory_data = {
-            "CARA": {"type": "Shoulder Bag", "quantity": 50},
-            "LIA": {"type": "Shoulder Bag", "quantity": 50},
-            "QUI": {"type": "Shoulder Bag", "quantity": 50},
-            "ANA": {"type": "Shoulder Bag", "quantity": 50},
-            "HYE": {"type": "Shoulder Bag", "quantity": 50},
-            "Baby": {"type": "Shoulder Bag", "quantity": 50},
-            "BIA": {"type": "Shoulder Bag", "quantity": 50},
-            "NYA": {"type": "Sling Bag", "quantity": 50},
-            "ORA": {"type": "Sling Bag", "quantity": 50},
-            "Normal": {"type": "Tote Bag", "quantity": 50},
-            "Large": {"type": "Tote Bag", "quantity": 50},
-            "MEG": {"type": "Coin Purse", "quantity": 50},
-            "AURA": {"type": "Coin Purse", "quantity": 25},
-            "EVA": {"type": "Coin Purse", "quantity": 50},
-            "AVA": {"type": "Coin Purse", "quantity": 50},
-            "Standard": {"type": "Saddle Bag", "quantity": 50},
-}
+        self.inventory_data = state.get('inventory') or get_catalog().initial_inventory()
 
         self.view_creators = {
             'startup': create_startup_splash,
@@ -48,6 +48,22 @@ class MainWindow(QMainWindow):
             'customer_catalog': create_customer_page,
             'shopping_cart': create_cart_view,
         }
+        # built views are kept and reused; the splash only ever shows once
+        self.views = ViewPool(self.view_creators, transient=('startup',))
+
+        # the SQLite backend writes every change through, so it needs no autosave
+        self.autosave = None
+        self.unsaved_changes = False
+        if AUTOSAVE_INTERVAL > 0 and not use_sqlite():
+            self.autosave = AutosaveWorker()
+            self.autosave.start()
+            self.state_copier = StateCopier()
+            self.autosave_scheduled = False
+            self.autosave_timer = QTimer(self)
+            self.autosave_timer.timeout.connect(self.submit_autosave)
+            self.autosave_timer.start(int(AUTOSAVE_INTERVAL * 1000))
+        elif not use_sqlite():
+            start_garbage_collection()
 
         self.setup_ui()
         self.switch_view(initial_view)
@@ -118,15 +134,22 @@ class MainWindow(QMainWindow):
         self.panel.toggle()
 
     def switch_view(self, view_name):
+        if view_name in SESSION_VIEWS and self.resume_session(view_name):
+            view_name = SESSION_VIEWS[view_name]
+
         if view_name in self.view_creators:
  
             for i in reversed(range(self.view_layout.count())):
                 widget_to_remove = self.view_layout.itemAt(i).widget()
                 if widget_to_remove:
-                    widget_to_remove.setParent(None)
+                    self.view_layout.removeWidget(widget_to_remove)
+                    widget_to_remove.hide()
+                    if not self.views.keeps(widget_to_remove):
+                        release(widget_to_remove)
 
-            new_view = self.view_creators[view_name](self)
+            new_view = self.views.get(view_name, self)
             self.view_layout.addWidget(new_view)
+            new_view.show()
 
             if view_name in ("customer", "admin"):
                 self.collapse_btn.show()
@@ -138,11 +161,76 @@ class MainWindow(QMainWindow):
         else:
             print(f"Error: View '{view_name}' not found.")
 
+    def start_session(self, role, username, profile=None, remember=False):
+        self.session_tokens[role] = sessions.issue(role, username, profile, remember=remember)
+
+    def resume_session(self, role):
+        session = sessions.validate(self.session_tokens.get(role))
+        if session is None:
+            self.session_tokens.pop(role, None)
+            return False
+        if role == 'admin' and get_admin_role(session['username']) is None:
+            # the account was removed or renamed since the session began
+            sessions.revoke(self.session_tokens.pop(role))
+            return False
+        if role == 'customer' and session.get('profile') and self.active_user != session['profile']:
+            self.active_user = session['profile']
+            self.record_change("user", user=self.active_user)
+        return True
+
+    def admin_role(self):
+        session = sessions.validate(self.session_tokens.get('admin'))
+        return get_admin_role(session['username']) if session else None
+
+    def log_out(self, role, view_name=None):
+        sessions.revoke(self.session_tokens.pop(role, None))
+        # the next user gets a fresh page rather than this one's filters and scroll
+        self.views.discard(SESSION_VIEWS[role])
+        self.switch_view(view_name or role)
+
     def show_feedback(self):
 
         dialog = FeedbackDialog(self)
         dialog.exec()
 
+    def record_change(self, op, **fields):
+        # journal the change; every JOURNAL_COMPACT_EVERY records fold it into a snapshot
+        try:
+            compact = append_journal(op, **fields) >= JOURNAL_COMPACT_EVERY
+        except OSError as e:
+            print(f"[WARN] Could not journal '{op}': {e}")
+            compact = False
+
+        if self.autosave:
+            self.state_copier.note(op, fields)
+            self.unsaved_changes = True
+            # a save already under way rebases the journal when it lands
+            if compact and not self.autosave.busy and not self.autosave_scheduled:
+                self.autosave_scheduled = True
+                # once the handler that made this change has finished with the state
+                QTimer.singleShot(0, self.submit_autosave)
+        elif compact:
+            save_file_state(self.inventory_data, self.orders, self.active_user, self.cart_items)
+
+    def capture_state(self):
+        # on the GUI thread, so the copy matches the journal up to the mark
+        mark = journal_mark()
+        state = self.state_copier.copy(self.inventory_data, self.orders, self.active_user, self.cart_items)
+        return state, mark
+
+    def submit_autosave(self, wait_for_save=True):
+        self.autosave_scheduled = False
+        if self.unsaved_changes and not (wait_for_save and self.autosave.busy):
+            self.unsaved_changes = False
+            self.autosave.submit(*self.capture_state())
+
+    def closeEvent(self, event):
+        if self.autosave:
+            self.autosave_timer.stop()
+            self.submit_autosave(wait_for_save=False)
+            self.autosave.stop(flush=True)
+        super().closeEvent(event)
+
     def update_cart_count(self):
         if self.cart_count_label:
             total_items = sum(item['quantity'] for item in self.cart_items)
@@ -150,23 +238,5 @@ class MainWindow(QMainWindow):
             self.cart_count_label.setText(f"({total_items} )")
 
     def update_product_card_display(self, product_name: str):
-        card = self.product_card_map.get(product_name)
-        if not card:
-            return
-
-        inv = self.inventory_data
-        
-        if product_name in inv and "Customized" not in product_name:
-            current_stock = inv[product_name]["quantity"]
-            new_stock_text = f"  —  {current_stock} left" if current_stock > 0 else "  —  Out of Stock"
-            
-            # Update name_label
-            card.name_label.setText(f"{card.product_material}: {card.product_name}{new_stock_text}")
-            
-            # Update buy_btn state
-            if current_stock == 0:
-                card.buy_btn.setEnabled(False)
-                card.buy_btn.setText("Out of Stock")
-            elif not card.buy_btn.isEnabled():
-                card.buy_btn.setEnabled(True)
-                card.buy_btn.setText("Add to Cart")
+        if self.product_model is not None:
+            self.product_model.product_changed(product_name)
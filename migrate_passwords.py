@@ -0,0 +1,37 @@
+"""Hash every plaintext customer and admin password, spread across all cores.
+
+    python migrate_passwords.py [--workers N]
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from admin_auth import admin_directory
+from customer_auth import customer_directory
+from passwords import hash_password, is_hashed
+
+
+def migrate_directory(directory, pool):
+    """Rehash one account store's plaintext passwords; returns (migrated, total)."""
+    total = 0
+    pending = []
+    for username, record in directory.iter_records():
+        total += 1
+        if record.get('password') is not None and not is_hashed(record['password']):
+            pending.append((username, record))
+    hashes = pool.map(hash_password, [record['password'] for _, record in pending], chunksize=32)
+    directory.add_many((username, dict(record, password=hashed))
+                       for (username, record), hashed in zip(pending, hashes))
+    directory.compact()
+    return len(pending), total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        migrated, total = migrate_directory(customer_directory, pool)
+        print(f"{migrated} of {total} customer passwords hashed")
+        migrated, total = migrate_directory(admin_directory, pool)
+        print(f"{migrated} of {total} admin passwords hashed")
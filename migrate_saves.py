@@ -0,0 +1,70 @@
+"""Upgrade every snapshot in save_files/ to the current schema in place.
+
+    python migrate_saves.py [--workers N]
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from migrations import migrate_state, needs_migration
+from persistence import (SECTIONS, atomic_write, get_save_files, manifest_entry, resolve_sections,
+                         update_manifest_entries, write_blob)
+from snapshot_codecs import decode_state, detect_codec, encode_state
+
+
+def migrate_save(path):
+    """Rewrite one snapshot with its original codec. Returns its new
+    manifest entry, or None when it was already current.
+
+    A deduplicated snapshot is migrated with its sections read in; the
+    migrated sections go to new blobs and the pointer is rewritten to them,
+    leaving the old blobs to garbage collection."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    state = decode_state(data)
+    if not needs_migration(state):
+        return None
+    deduplicated = 'sections' in state
+    state = migrate_state(resolve_sections(state))
+
+    blobs = None
+    if deduplicated:
+        pointer = {key: value for key, value in state.items() if key not in SECTIONS}
+        pointer['sections'] = {key: write_blob(state.get(key)) for key in SECTIONS}
+        blobs = list(pointer['sections'].values())
+        new_data = encode_state(pointer, detect_codec(data))
+    else:
+        new_data = encode_state(state, detect_codec(data))
+    atomic_write(path, new_data)
+    return manifest_entry(path, state, new_data, blobs)
+
+
+def migrate_all_saves(workers=None):
+    paths = get_save_files()
+    migrated, failed = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {path: pool.submit(migrate_save, path) for path in paths}
+        for path, future in futures.items():
+            try:
+                entry = future.result()
+            except (OSError, ValueError) as e:
+                failed.append((path, str(e)))
+                continue
+            if entry:
+                migrated.append(entry)
+    if migrated:
+        update_manifest_entries(migrated)
+    return len(paths), migrated, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    total, migrated, failed = migrate_all_saves(args.workers)
+    for entry in migrated:
+        print(f"migrated {entry['file']}")
+    for path, error in failed:
+        print(f"FAILED {os.path.basename(path)}: {error}")
+    print(f"{len(migrated)} of {total} saves upgraded, {total - len(migrated) - len(failed)} already current")
@@ -0,0 +1,112 @@
+from catalog import get_catalog
+
+SCHEMA_VERSION = 3
+
+# Saved-state schemas:
+#   0  early test saves: inventory {name: qty}, cart items and order items as plain names
+#   1  nested inventory {name: {"type", "quantity"}}, cart lines and orders as dicts
+#   2  version 1 plus an explicit "schema_version" field
+#   3  inventory keyed by catalog SKU ("BABY", not "Baby")
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def detect_version(state):
+    if 'schema_version' in state:
+        return state['schema_version']
+    inventory = state.get('inventory') or {}
+    if any(not isinstance(info, dict) for info in inventory.values()):
+        return 0
+    if any(not isinstance(item, dict) for item in state.get('cart_items') or []):
+        return 0
+    return 1
+
+
+def _line(product, quantity=1, buyer=None):
+    return {
+        "buyer": buyer,
+        "product": product,
+        "category": "",
+        "material": "",
+        "quantity": quantity,
+        "color": "",
+        "price": 0,
+        "total": 0,
+    }
+
+
+def _v0_to_v1(state):
+    inventory = {}
+    for name, info in (state.get('inventory') or {}).items():
+        if isinstance(info, dict):
+            inventory[name] = info
+        else:
+            inventory[name] = {"type": "", "quantity": int(info or 0)}
+    state['inventory'] = inventory
+
+    user = state.get('active_user')
+    if isinstance(user, str):
+        user = {"username": user}
+        state['active_user'] = user
+
+    state['cart_items'] = [item if isinstance(item, dict) else _line(item, buyer=user)
+                           for item in state.get('cart_items') or []]
+
+    orders = []
+    for order in state.get('orders') or []:
+        if isinstance(order, dict) and 'items' in order and 'product' not in order:
+            # one order line per item, like checkout produces today
+            orders.extend(_line(item, buyer=order.get('buyer')) for item in order['items'])
+        else:
+            orders.append(order)
+    state['orders'] = orders
+    return state
+
+
+def _v1_to_v2(state):
+    state.setdefault('active_user', None)
+    state.setdefault('cart_items', [])
+    state.setdefault('orders', [])
+    return state
+
+
+def _v2_to_v3(state):
+    catalog = get_catalog()
+    inventory = {}
+    for name, info in (state.get('inventory') or {}).items():
+        sku = catalog.canonical_sku(name)
+        # where two spellings of one product were both saved, the SKU spelling wins
+        if sku not in inventory or name == sku:
+            inventory[sku] = info
+    state['inventory'] = inventory
+    return state
+
+
+# MIGRATIONS[n] upgrades a version n state to version n + 1
+MIGRATIONS = {
+    0: _v0_to_v1,
+    1: _v1_to_v2,
+    2: _v2_to_v3,
+}
+
+
+def migrate_state(state):
+    """Upgrade a loaded state to SCHEMA_VERSION. Current-version states are
+    returned untouched without inspecting their contents."""
+    if state.get('schema_version') == SCHEMA_VERSION:
+        return state
+
+    version = detect_version(state)
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        raise SchemaError(f"Save schema version {version} is newer than this build ({SCHEMA_VERSION})")
+    while version < SCHEMA_VERSION:
+        state = MIGRATIONS[version](state)
+        version += 1
+    state['schema_version'] = SCHEMA_VERSION
+    return state
+
+
+def needs_migration(state):
+    return state.get('schema_version') != SCHEMA_VERSION
@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import hmac
+import os
+
+# KDF for new hashes: scrypt or pbkdf2_sha256. Existing hashes keep verifying
+# with the parameters stored in them and are upgraded on the next login.
+PASSWORD_KDF = os.getenv('SISIT_PASSWORD_KDF', 'scrypt')
+SCRYPT_N = int(os.getenv('SISIT_SCRYPT_N', str(2 ** 14)))
+SCRYPT_R = int(os.getenv('SISIT_SCRYPT_R', '8'))
+SCRYPT_P = int(os.getenv('SISIT_SCRYPT_P', '1'))
+PBKDF2_ITERATIONS = int(os.getenv('SISIT_PBKDF2_ITERATIONS', '600000'))
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# stored formats:
+#   scrypt$<n>$<r>$<p>$<salt>$<key>
+#   pbkdf2_sha256$<iterations>$<salt>$<key>
+# with salt and key base64-encoded. Anything else is a legacy plaintext password.
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode('ascii')
+
+
+def _scrypt(password, salt, n, r, p):
+    # scrypt needs 128 * n * r bytes; leave headroom over OpenSSL's 32MB default
+    return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations, dklen=KEY_BYTES)
+
+
+def hash_password(password, kdf=None):
+    kdf = kdf or PASSWORD_KDF
+    salt = os.urandom(SALT_BYTES)
+    if kdf == 'scrypt':
+        key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(key)}"
+    if kdf == 'pbkdf2_sha256':
+        key = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+        return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(key)}"
+    raise ValueError(f"Unknown password KDF '{kdf}'")
+
+
+def _parse(stored):
+    parts = stored.split('$') if isinstance(stored, str) else []
+    try:
+        if parts[0] == 'scrypt' and len(parts) == 6:
+            return 'scrypt', tuple(int(x) for x in parts[1:4]), base64.b64decode(parts[4]), base64.b64decode(parts[5])
+        if parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+            return 'pbkdf2_sha256', (int(parts[1]),), base64.b64decode(parts[2]), base64.b64decode(parts[3])
+    except (IndexError, ValueError):
+        pass
+    return None
+
+
+def is_hashed(stored):
+    return _parse(stored) is not None
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash, or against a legacy plaintext value."""
+    if stored is None or password is None:
+        return False
+    parsed = _parse(stored)
+    if parsed is None:
+        return hmac.compare_digest(str(stored).encode('utf-8'), password.encode('utf-8'))
+    kdf, params, salt, key = parsed
+    if kdf == 'scrypt':
+        candidate = _scrypt(password, salt, *params)
+    else:
+        candidate = _pbkdf2(password, salt, *params)
+    return hmac.compare_digest(candidate, key)
+
+
+def needs_rehash(stored):
+    """True for plaintext passwords and hashes made with other than the current settings."""
+    parsed = _parse(stored)
+    if parsed is None:
+        return True
+    kdf, params, _, _ = parsed
+    if kdf != PASSWORD_KDF:
+        return True
+    if kdf == 'scrypt':
+        return params != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return params != (PBKDF2_ITERATIONS,)
@@ -1,78 +1,554 @@
+import hashlib
 import json
 import os
+import threading
 from datetime import datetime
+from itertools import chain
+
+import sqlite_store
+from catalog import get_catalog
+from snapshot_codecs import encode_state, decode_state
+from migrations import migrate_state, needs_migration, SCHEMA_VERSION
+from stream_loader import LazyOrders, iter_array_file, iter_member_file, read_without_member
 
 SAVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'save_files')
+JOURNAL_PATH = os.path.join(SAVE_DIR, 'journal.jsonl')
+
+# write a compacted snapshot after this many journal records
+JOURNAL_COMPACT_EVERY = 200
+
+# 'json' keeps snapshot files plus a journal; 'sqlite' keeps state in save_files/sisit.db
+STORAGE_BACKEND = os.getenv('SISIT_STORAGE', 'json').lower()
+
+# snapshot file format: json, json-zlib, json-lzma or binary (see snapshot_codecs)
+SNAPSHOT_CODEC = os.getenv('SISIT_SNAPSHOT_CODEC', 'json-zlib')
+SNAPSHOT_EXTENSIONS = ('.json', '.snap')
+
+# store each distinct inventory/orders/cart section once under save_files/blobs
+# and write snapshots as small files pointing at them
+DEDUP_SNAPSHOTS = os.getenv('SISIT_DEDUP_SNAPSHOTS', '1') != '0'
+BLOB_DIR = os.path.join(SAVE_DIR, 'blobs')
+SECTIONS = ('inventory', 'orders', 'cart_items')
+# an order history saved as a base plus appended tails is folded back into
+# base and one tail once it spans this many blobs
+ORDER_SEGMENTS_MAX = 8
+
+# retention: keep every save for a day, the newest per hour for a week, then the newest per day
+RETENTION_KEEP_ALL_HOURS = 24
+RETENTION_HOURLY_DAYS = 7
+
+def use_sqlite():
+    return STORAGE_BACKEND == 'sqlite'
+
+# guards the journal against appends racing a compaction
+journal_lock = threading.RLock()
+manifest_lock = threading.RLock()
+_journal_length = None
+# bumped each time the journal is rebased, so a mark taken before that is stale
+_journal_generation = 0
 
 def ensure_save_dir():
 
     if not os.path.exists(SAVE_DIR):
         os.makedirs(SAVE_DIR)
 
-def save_file_state(inventory_data, orders, active_user=None, cart_items=None):
+def atomic_write(path, data):
+    """Write to a temp file, fsync it and rename it over path."""
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    # unique per writer: migrate_saves workers may store the same blob at once
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def save_file_state(inventory_data, orders, active_user=None, cart_items=None, journal_mark=None, codec=None):
+    """Write a snapshot. journal_mark is journal_mark() as of when the state
+    was captured; records appended after it are kept in the new journal."""
+    codec = codec or SNAPSHOT_CODEC
 
     ensure_save_dir()
+    if use_sqlite():
+        return sqlite_store.save_state(inventory_data, orders, active_user, cart_items)
+
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = os.path.join(SAVE_DIR, f'file_state_{timestamp}.json')
-    
+    extension = '.json' if codec == 'json' else '.snap'
+    filename = os.path.join(SAVE_DIR, f'file_state_{timestamp}{extension}')
+
     state = {
+        'schema_version': SCHEMA_VERSION,
         'inventory': inventory_data,
         'orders': orders,
         'active_user': active_user,
         'cart_items': cart_items or [],
         'saved_at': timestamp
     }
-    
-    with open(filename, 'w') as f:
-        json.dump(state, f, indent=2)
+
+    with manifest_lock:
+        blobs = None
+        if DEDUP_SNAPSHOTS:
+            filename = os.path.join(SAVE_DIR, f'file_state_{timestamp}.json')
+            pointer = {key: value for key, value in state.items() if key not in SECTIONS}
+            pointer['sections'] = {key: write_blob(state[key], codec) for key in SECTIONS if key != 'orders'}
+            pointer['sections']['orders'] = write_orders(orders, codec)
+            blobs = section_blobs(pointer['sections'])
+            data = encode_state(pointer, 'json')
+        else:
+            if isinstance(orders, LazyOrders):
+                state['orders'] = orders.materialize()
+            data = encode_state(state, codec)
+
+        atomic_write(filename, data)
+        # the snapshot now holds everything the journal recorded up to the mark
+        reset_journal(filename, keep_after=journal_mark)
+        add_manifest_entry(manifest_entry(filename, state, data, blobs))
     return filename
 
 def get_save_files():
+    """Snapshot paths, newest first, read from the manifest."""
+    return [os.path.join(SAVE_DIR, entry['file']) for entry in reversed(read_manifest())]
+
+def get_latest_save():
+    entries = read_manifest()
+    if not entries:
+        return None
+    return os.path.join(SAVE_DIR, entries[-1]['file'])
+
+def list_saves(offset=0, limit=None):
+    """Manifest entries newest first, sliced for paging."""
+    entries = read_manifest()
+    end = len(entries) - offset
+    start = 0 if limit is None else max(end - limit, 0)
+    return list(reversed(entries[start:max(end, 0)]))
+
+def count_saves():
+    return len(read_manifest())
+
+# manifest: save_files/index.json lists every snapshot oldest first
+
+MANIFEST_PATH = os.path.join(SAVE_DIR, 'index.json')
+_manifest_cache = None
+
+def _summarize(state):
+    inventory = state.get('inventory') or {}
+    total_stock = 0
+    for info in inventory.values():
+        qty = info.get('quantity', 0) if isinstance(info, dict) else info
+        try:
+            total_stock += int(qty)
+        except (TypeError, ValueError):
+            pass
+    return {
+        'products': len(inventory),
+        'orders': len(state.get('orders') or []),
+        'cart_items': len(state.get('cart_items') or []),
+        'total_stock': total_stock,
+    }
+
+def manifest_entry(path, state, data, blobs=None):
+    return {
+        'file': os.path.basename(path),
+        'saved_at': state.get('saved_at'),
+        'mtime': os.path.getmtime(path),
+        'size': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'blobs': blobs or [],
+        'summary': _summarize(state),
+    }
+
+def _write_manifest(entries):
+    global _manifest_cache
     ensure_save_dir()
-    files = []
-    for f in os.listdir(SAVE_DIR):
-        if f.startswith('file_state_') and f.endswith('.json'):
-            path = os.path.join(SAVE_DIR, f)
-            timestamp = os.path.getmtime(path)
-            files.append((path, timestamp))
-    return [f[0] for f in sorted(files, key=lambda x: x[1], reverse=True)]
-
-def load_file_state(filepath=None):
+    atomic_write(MANIFEST_PATH, json.dumps({'version': 1, 'saves': entries}, separators=(',', ':')))
+    _manifest_cache = entries
+
+def rebuild_manifest():
+    """Scan save_files/ once and index every snapshot in it."""
     ensure_save_dir()
-    if not filepath:
-        saves = get_save_files()
-        if not saves:
-            return None
-        filepath = saves[0]
-    
+    entries = []
+    for name in os.listdir(SAVE_DIR):
+        if not (name.startswith('file_state_') and name.endswith(SNAPSHOT_EXTENSIONS)):
+            continue
+        path = os.path.join(SAVE_DIR, name)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            state = decode_state(data)
+            blobs = section_blobs(state.get('sections', {}))
+            state = resolve_sections(state)
+        except (OSError, ValueError):
+            continue
+        entries.append(manifest_entry(path, state, data, blobs))
+    entries.sort(key=lambda e: (e['saved_at'] or '', e['mtime']))
+    with manifest_lock:
+        _write_manifest(entries)
+    return entries
+
+def read_manifest():
+    global _manifest_cache
+    if _manifest_cache is not None:
+        return _manifest_cache
+    try:
+        with open(MANIFEST_PATH, 'r') as f:
+            _manifest_cache = json.load(f)['saves']
+    except (OSError, ValueError, KeyError):
+        return rebuild_manifest()
+    return _manifest_cache
+
+def add_manifest_entry(entry):
+    update_manifest_entries([entry])
+
+def update_manifest_entries(updated):
+    """Replace entries for files already indexed and append the rest."""
+    by_file = {e['file']: e for e in updated}
+    with manifest_lock:
+        entries = [by_file.pop(e['file'], e) for e in read_manifest()]
+        entries.extend(by_file.values())
+        _write_manifest(entries)
+
+def remove_manifest_entries(files):
+    files = {os.path.basename(f) for f in files}
+    with manifest_lock:
+        _write_manifest([e for e in read_manifest() if e['file'] not in files])
+
+def load_file_state(filepath=None, lazy_orders=False):
+    """Load a snapshot. Without a path, rebuild the current state as the
+    journal's base snapshot plus a replay of the journal. With lazy_orders
+    the order history is a LazyOrders read from disk as it is used."""
+    ensure_save_dir()
+    if use_sqlite() and not filepath:
+        return sqlite_store.load_state(lazy_orders)
+
+    replay = not filepath
+    records = []
+    if replay:
+        base, records = read_journal()
+        if base and os.path.exists(base):
+            filepath = base
+        else:
+            filepath = get_latest_save()
+            if not filepath and not records:
+                return None
+
     try:
-        with open(filepath, 'r') as f:
-            state = json.load(f)
+        if not filepath:
+            # changes journaled before any snapshot was written apply to the defaults
+            state = {'schema_version': SCHEMA_VERSION, 'inventory': get_catalog().initial_inventory(),
+                     'orders': [], 'active_user': None, 'cart_items': []}
+        else:
+            state = read_snapshot_lazily(filepath) if lazy_orders else None
+        if state is None:
+            state = migrate_state(read_snapshot(filepath))
+    except (ValueError, FileNotFoundError):
+        return None
+
+    for record in records:
+        apply_journal_record(state, record)
+    return state
+
+def restore_file_state(filepath, lazy_orders=False):
+    """Load a snapshot and make it the current state that new changes
+    are journaled against."""
+    state = load_file_state(filepath, lazy_orders)
+    if state is None:
+        return None
+    if use_sqlite():
+        sqlite_store.save_state(state.get('inventory', {}), state.get('orders', []),
+                                state.get('active_user'), state.get('cart_items', []))
+    else:
+        reset_journal(filepath)
+    return state
+
+def read_snapshot(filepath):
+    """Decode one snapshot file, whatever codec it was written with."""
+    with open(filepath, 'rb') as f:
+        return resolve_sections(decode_state(f.read()))
+
+# streaming loads
+
+# snapshots smaller than this are simply read whole
+LAZY_LOAD_MIN_BYTES = 64 * 1024
+
+def _saved_order_count(filepath):
+    name = os.path.basename(filepath)
+    for entry in reversed(read_manifest()):
+        if entry['file'] == name:
+            return entry.get('summary', {}).get('orders')
+    return None
+
+def read_snapshot_lazily(filepath):
+    """Read a current-schema snapshot with its orders left on disk.
+    Returns None when the snapshot has to be read whole instead."""
+    total = _saved_order_count(filepath)
+    if os.path.getsize(filepath) < LAZY_LOAD_MIN_BYTES:
+        with open(filepath, 'rb') as f:
+            state = decode_state(f.read())
+        sections = state.get('sections')
+        if not sections or needs_migration(state):
+            return None
+        digest = sections.pop('orders')
+        state = resolve_sections(state)
+        paths = [blob_path(segment) for segment in _segments(digest)]
+        state['orders'] = LazyOrders(lambda: chain.from_iterable(iter_array_file(path) for path in paths),
+                                     total, digest)
         return state
-    except (json.JSONDecodeError, FileNotFoundError):
+
+    header = read_without_member(filepath, 'orders')
+    if header is None or needs_migration(header):
         return None
+    header['orders'] = LazyOrders(lambda: iter_member_file(filepath, 'orders'), total)
+    return header
+
+# content-addressed section blobs
+
+def section_hash(value):
+    canonical = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def blob_path(digest):
+    return os.path.join(BLOB_DIR, digest[:2], digest)
+
+def write_blob(value, codec=None):
+    """Store value once under its content hash and return the hash."""
+    if isinstance(value, LazyOrders):
+        value = value.materialize()
+    digest = section_hash(value)
+    path = blob_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, encode_state(value, codec or SNAPSHOT_CODEC))
+    return digest
+
+def read_blob(digest):
+    with open(blob_path(digest), 'rb') as f:
+        return decode_state(f.read())
+
+def _segments(section):
+    # the orders section is one digest, or a list of them for a base plus tails
+    return section if isinstance(section, list) else [section]
+
+def section_blobs(sections):
+    """Every blob digest a pointer's sections refer to."""
+    return [digest for section in sections.values() for digest in _segments(section)]
+
+def read_section(section):
+    segments = _segments(section)
+    if len(segments) == 1:
+        return read_blob(segments[0])
+    return [item for digest in segments for item in read_blob(digest)]
+
+def write_orders(orders, codec=None):
+    """Store an order history and return its section. A lazily loaded
+    history that was only appended to keeps its blobs and gains one for the
+    appended orders, so saving it never reads the whole history in."""
+    if not isinstance(orders, LazyOrders) or orders.modified or orders.digest is None:
+        return write_blob(orders, codec)
+    segments = _segments(orders.digest)
+    if not all(os.path.exists(blob_path(digest)) for digest in segments):
+        return write_blob(orders, codec)
+    if not orders.tail:
+        return orders.digest
+    if len(segments) >= ORDER_SEGMENTS_MAX:
+        tail = [order for digest in segments[1:] for order in read_blob(digest)]
+        return [segments[0], write_blob(tail + orders.tail, codec)]
+    return segments + [write_blob(orders.tail, codec)]
+
+def resolve_sections(state):
+    sections = state.pop('sections', None)
+    if sections:
+        for key, section in sections.items():
+            state[key] = read_section(section)
+    return state
+
+# retention and garbage collection
+
+def _entry_time(entry):
+    try:
+        return datetime.strptime(entry.get('saved_at') or '', '%Y%m%d_%H%M%S')
+    except ValueError:
+        return datetime.fromtimestamp(entry.get('mtime', 0))
+
+def select_expired(entries, now=None):
+    """Manifest entries the retention policy no longer keeps."""
+    now = now or datetime.now()
+    kept_buckets = set()
+    expired = []
+    # newest first, so the first save seen in an hour/day bucket is the one kept
+    for entry in sorted(entries, key=_entry_time, reverse=True):
+        when = _entry_time(entry)
+        age_hours = (now - when).total_seconds() / 3600
+        if age_hours < RETENTION_KEEP_ALL_HOURS:
+            continue
+        if age_hours < RETENTION_HOURLY_DAYS * 24:
+            bucket = ('hour', when.strftime('%Y%m%d%H'))
+        else:
+            bucket = ('day', when.strftime('%Y%m%d'))
+        if bucket in kept_buckets:
+            expired.append(entry)
+        else:
+            kept_buckets.add(bucket)
+    return expired
+
+def collect_garbage(now=None):
+    """Drop snapshots outside the retention policy, then delete blobs no
+    remaining snapshot points at. Returns (snapshots removed, blobs removed)."""
+    protected = set()
+    base = read_journal()[0]
+    if base:
+        protected.add(os.path.basename(base))
+
+    with manifest_lock:
+        entries = read_manifest()
+        if entries:
+            protected.add(entries[-1]['file'])
+        expired = [e for e in select_expired(entries, now) if e['file'] not in protected]
+        for entry in expired:
+            try:
+                os.remove(os.path.join(SAVE_DIR, entry['file']))
+            except FileNotFoundError:
+                pass
+        if expired:
+            remove_manifest_entries([e['file'] for e in expired])
+
+        live = {digest for entry in read_manifest() for digest in entry.get('blobs', [])}
+        removed_blobs = 0
+        if os.path.isdir(BLOB_DIR):
+            for prefix in os.listdir(BLOB_DIR):
+                folder = os.path.join(BLOB_DIR, prefix)
+                for name in os.listdir(folder):
+                    if name not in live:
+                        os.remove(os.path.join(folder, name))
+                        removed_blobs += 1
+    return len(expired), removed_blobs
+
+def start_garbage_collection():
+    thread = threading.Thread(target=collect_garbage, name='save-gc', daemon=True)
+    thread.start()
+    return thread
+
+# journal
+
+def reset_journal(base_snapshot=None, keep_after=None):
+    """Start a new journal on top of base_snapshot, carrying over the
+    records past keep_after (a journal_mark()) if given. Returns False,
+    leaving the journal alone, when it was rebased since that mark: the
+    journal's current base is then newer than base_snapshot."""
+    global _journal_length, _journal_generation
+    ensure_save_dir()
+    with journal_lock:
+        kept = []
+        if keep_after is not None:
+            generation, length = keep_after
+            if generation != _journal_generation:
+                return False
+            kept = read_journal()[1][length:]
+        lines = []
+        if base_snapshot:
+            lines.append(json.dumps({'op': 'base', 'snapshot': os.path.basename(base_snapshot)}) + '\n')
+        lines.extend(json.dumps(record, separators=(',', ':')) + '\n' for record in kept)
+        atomic_write(JOURNAL_PATH, ''.join(lines))
+        _journal_length = len(kept)
+        _journal_generation += 1
+    return True
+
+def journal_length():
+    global _journal_length
+    with journal_lock:
+        if _journal_length is None:
+            _journal_length = len(read_journal()[1])
+        return _journal_length
+
+def journal_mark():
+    """The journal's current position, to pass to save_file_state along
+    with state captured at this point."""
+    with journal_lock:
+        return _journal_generation, journal_length()
+
+def append_journal(op, **fields):
+    """Append one change record and return how many records the journal holds."""
+    global _journal_length
+    ensure_save_dir()
+    record = dict(fields, op=op)
+    if use_sqlite():
+        # the database is updated in place, so there is nothing to compact
+        sqlite_store.apply_change(record)
+        return 0
+    line = json.dumps(record, separators=(',', ':')) + '\n'
+    with journal_lock:
+        with open(JOURNAL_PATH, 'a') as f:
+            f.write(line)
+        if _journal_length is None:
+            _journal_length = len(read_journal()[1])
+        else:
+            _journal_length += 1
+        return _journal_length
+
+def read_journal():
+    """Return (base snapshot path or None, change records)."""
+    base = None
+    records = []
+    if not os.path.exists(JOURNAL_PATH):
+        return base, records
+    with open(JOURNAL_PATH, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # torn final write from a crash; everything before it is intact
+                break
+            if record.get('op') == 'base':
+                base = os.path.join(SAVE_DIR, record['snapshot'])
+            else:
+                records.append(record)
+    return base, records
+
+def _same_cart_line(a, b):
+    return all(a.get(k) == b.get(k) for k in ('product', 'category', 'material', 'color'))
+
+def apply_journal_record(state, record):
+    op = record.get('op')
+    inventory = state.setdefault('inventory', {})
+    cart = state.setdefault('cart_items', [])
+    orders = state.setdefault('orders', [])
+
+    if op == 'stock':
+        inventory.setdefault(get_catalog().canonical_sku(record['product']), {})['quantity'] = record['quantity']
+    elif op == 'cart_add':
+        item = record['item']
+        for line in cart:
+            if _same_cart_line(line, item):
+                line['quantity'] = line.get('quantity', 0) + item['quantity']
+                line['total'] = record.get('line_total', line.get('total'))
+                break
+        else:
+            cart.append(dict(item))
+    elif op == 'cart_remove':
+        for i, line in enumerate(cart):
+            if _same_cart_line(line, record['item']):
+                cart.pop(i)
+                break
+    elif op == 'checkout':
+        orders.extend(cart)
+        state['cart_items'] = []
+    elif op == 'orders_remove':
+        for index in sorted(record['indexes'], reverse=True):
+            if index < len(orders):
+                orders.pop(index)
+    elif op == 'user':
+        state['active_user'] = record.get('user')
 
 def get_initial_inventory():
+    if use_sqlite():
+        inventory = sqlite_store.load_inventory()
+        if inventory:
+            return inventory
+
     state = load_file_state()
     if state and 'inventory' in state:
         return state['inventory']
-    
-    return {
-        "CARA": {"type": "Shoulder Bag", "quantity": 50},
-        "LIA": {"type": "Shoulder Bag", "quantity": 50},
-        "QUI": {"type": "Shoulder Bag", "quantity": 50},
-        "ANA": {"type": "Shoulder Bag", "quantity": 50},
-        "HYE": {"type": "Shoulder Bag", "quantity": 50},
-        "BABY": {"type": "Shoulder Bag", "quantity": 50},
-        "BIA": {"type": "Shoulder Bag", "quantity": 50},
-        "NYA": {"type": "Sling Bag", "quantity": 50},
-        "ORA": {"type": "Sling Bag", "quantity": 50},
-        "NORMAL": {"type": "Tote Bag", "quantity": 50},
-        "LARGE": {"type": "Tote Bag", "quantity": 50},
-        "MEG": {"type": "Coin Purse", "quantity": 50},
-        "AURA": {"type": "Coin Purse", "quantity": 50},
-        "EVA": {"type": "Coin Purse", "quantity": 50},
-        "AVA": {"type": "Coin Purse", "quantity": 50},
-        "STANDARD": {"type": "Saddle Bag", "quantity": 50},
-    }
 
+    return get_catalog().initial_inventory()
@@ -0,0 +1,100 @@
+import os
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtGui import QPixmap
+
+# memory the shared pixmap cache may hold before it evicts the least recently used
+PIXMAP_CACHE_MB = float(os.getenv('SISIT_PIXMAP_CACHE_MB', '64'))
+
+
+def cache_key(path, size=None, mode=Qt.TransformationMode.SmoothTransformation,
+              aspect=Qt.AspectRatioMode.KeepAspectRatio):
+    """Key for path scaled to size (an int for a square box, (w, h) or a
+    QSize); size None is the image as decoded."""
+    if isinstance(size, QSize):
+        size = (size.width(), size.height())
+    elif isinstance(size, int):
+        size = (size, size)
+    return (os.path.abspath(path), size, mode if size else None, aspect if size else None)
+
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class PixmapCache:
+    """Decoded and scaled QPixmaps keyed by (path, size, transform mode,
+    aspect mode), evicted least recently used first once their total size
+    passes budget_bytes. GUI thread only, as QPixmap is."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # key -> (pixmap, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def insert(self, key, pixmap):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        size = pixmap_bytes(pixmap)
+        self._entries[key] = (pixmap, size)
+        self.bytes += size
+        # never evict the entry just added, even if it alone is over budget
+        while self.bytes > self.budget_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+        return pixmap
+
+    def pixmap(self, path, size=None, mode=Qt.TransformationMode.SmoothTransformation,
+               aspect=Qt.AspectRatioMode.KeepAspectRatio):
+        """path scaled to fit size, decoding and scaling only on a miss. A
+        missing or unreadable file gives a null QPixmap."""
+        key = cache_key(path, size, mode, aspect)
+        pixmap = self.find(key)
+        if pixmap is not None:
+            return pixmap
+        if key[1] is None:
+            return self.insert(key, QPixmap(path))
+        # scaled variants share one decoded source
+        source = self.pixmap(path)
+        if source.isNull():
+            return source
+        return self.insert(key, source.scaled(key[1][0], key[1][1], aspect, mode))
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self._entries), 'bytes': self.bytes}
+
+
+_cache = None
+
+def get_pixmap_cache():
+    global _cache
+    if _cache is None:
+        _cache = PixmapCache(int(PIXMAP_CACHE_MB * 1024 * 1024))
+    return _cache
+
+def cached_pixmap(path, size=None, mode=Qt.TransformationMode.SmoothTransformation,
+                  aspect=Qt.AspectRatioMode.KeepAspectRatio):
+    return get_pixmap_cache().pixmap(path, size, mode, aspect)
@@ -0,0 +1,287 @@
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QMenu
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPen
+
+from catalog import get_catalog
+from thumbnails import get_thumbnail_loader
+
+CARD_WIDTH, CARD_HEIGHT = 220, 280
+IMAGE_SIZE = 100
+MAX_QUANTITY = 99
+# rows handed to the grid at a time; more are fetched as it scrolls near the end
+FETCH_BATCH = 200
+
+ProductRole = Qt.ItemDataRole.UserRole
+# current stock, or None for products without a stock count
+StockRole = Qt.ItemDataRole.UserRole + 1
+ColorRole = Qt.ItemDataRole.UserRole + 2
+QuantityRole = Qt.ItemDataRole.UserRole + 3
+
+
+class ProductListModel(QAbstractListModel):
+    """The products currently shown in the catalog grid. Stock is read from
+    the main window's inventory at paint time, and each product's chosen
+    color and quantity live here instead of in per-card widgets. Rows reach
+    the view FETCH_BATCH at a time, so its layout work does not grow with
+    the catalog."""
+
+    # a product's stock changed; carries its SKU
+    stock_changed = pyqtSignal(str)
+
+    def __init__(self, main_window, products=(), parent=None):
+        super().__init__(parent)
+        self.main_window = main_window
+        self._choices = {}
+        self.set_products(products)
+        get_thumbnail_loader().thumbnail_ready.connect(self._thumbnail_ready)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._fetched:
+            return None
+        product = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return product['name']
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.pixmap(product)
+        if role == ProductRole:
+            return product
+        if role == StockRole:
+            return self.stock(product)
+        if role == ColorRole:
+            return self.choice(product)[0]
+        if role == QuantityRole:
+            return self.choice(product)[1]
+        return None
+
+    def set_products(self, products):
+        self.beginResetModel()
+        self._rows = list(products)
+        self._fetched = 0
+        self._row_of = {}
+        self._rows_by_image = {}
+        self._map_rows(min(len(self._rows), FETCH_BATCH))
+        self.endResetModel()
+
+    def _map_rows(self, end):
+        for row in range(self._fetched, end):
+            product = self._rows[row]
+            self._row_of[product['sku']] = row
+            self._rows_by_image.setdefault(product['name'].lower(), []).append(row)
+        self._fetched = end
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        end = min(len(self._rows), self._fetched + FETCH_BATCH)
+        self.beginInsertRows(QModelIndex(), self._fetched, end - 1)
+        self._map_rows(end)
+        self.endInsertRows()
+
+    def products(self):
+        return list(self._rows)
+
+    def index_of(self, sku):
+        row = self._row_of.get(sku)
+        return self.index(row) if row is not None else QModelIndex()
+
+    def stock(self, product):
+        inv = getattr(self.main_window, "inventory_data", {})
+        if product['sku'] in inv and product['tracked']:
+            return inv[product['sku']]["quantity"]
+        return None
+
+    def choice(self, product):
+        return self._choices.get(product['sku']) or (product['colors'][0] if product['colors'] else "", 1)
+
+    def set_choice(self, index, color=None, quantity=None):
+        product = self._rows[index.row()]
+        old_color, old_quantity = self.choice(product)
+        quantity = old_quantity if quantity is None else max(1, min(MAX_QUANTITY, quantity))
+        self._choices[product['sku']] = (old_color if color is None else color, quantity)
+        self.dataChanged.emit(index, index)
+
+    def pixmap(self, product):
+        # thumbnails are only requested for cards being painted, and arrive later
+        return get_thumbnail_loader().pixmap(product['name'], IMAGE_SIZE)
+
+    def _thumbnail_ready(self, name):
+        for row in self._rows_by_image.get(name, ()):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def refresh(self):
+        """Repaint every row, e.g. after the inventory was replaced wholesale."""
+        if self._fetched:
+            self.dataChanged.emit(self.index(0), self.index(self._fetched - 1))
+
+    def product_changed(self, name):
+        sku = get_catalog().canonical_sku(name)
+        index = self.index_of(sku)
+        if index.isValid():
+            self.dataChanged.emit(index, index)
+        self.stock_changed.emit(sku)
+
+
+def card_rects(rect):
+    """Where each part of a card sits inside its cell."""
+    left, top = rect.left() + 10, rect.top() + 8
+    return {
+        'card': rect.adjusted(2, 2, -2, -2),
+        'category': QRect(left, top, 200, 16),
+        'image': QRect(rect.left() + (rect.width() - IMAGE_SIZE) // 2, top + 20, IMAGE_SIZE, IMAGE_SIZE),
+        'name': QRect(left, top + 124, 200, 40),
+        'price': QRect(left, top + 166, 200, 20),
+        'color': QRect(left, top + 192, 120, 26),
+        'minus': QRect(left + 126, top + 192, 22, 26),
+        'quantity': QRect(left + 148, top + 192, 30, 26),
+        'plus': QRect(left + 178, top + 192, 22, 26),
+        'button': QRect(left, top + 232, 200, 30),
+    }
+
+
+def stock_text(stock):
+    if stock is None:
+        return "  —  Customizable"
+    return f"  —  {stock} left" if stock > 0 else "  —  Out of Stock"
+
+
+class ProductCardDelegate(QStyledItemDelegate):
+    """Paints a product card per row and turns clicks on its color box,
+    quantity arrows and Add to Cart button into model updates and
+    add_requested signals, so no per-product widgets are created."""
+
+    add_requested = pyqtSignal(object, str, int)
+
+    def sizeHint(self, option, index):
+        return QSize(CARD_WIDTH, CARD_HEIGHT)
+
+    def paint(self, painter, option, index):
+        product = index.data(ProductRole)
+        stock = index.data(StockRole)
+        rects = card_rects(option.rect)
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.setPen(QPen(QColor("#0078d7" if hovered else "#e0e0e0")))
+        painter.setBrush(QColor("#fafafa"))
+        painter.drawRoundedRect(rects['card'], 8, 8)
+
+        font = QFont(option.font)
+        font.setPixelSize(11)
+        painter.setFont(font)
+        painter.setPen(QColor("#888888"))
+        painter.drawText(rects['category'], Qt.AlignmentFlag.AlignCenter, product['category'])
+
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is None:
+            # still loading
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor("#eeeeee"))
+            painter.drawRoundedRect(rects['image'], 5, 5)
+        elif not pixmap.isNull():
+            target = rects['image']
+            x = target.left() + (target.width() - pixmap.width()) // 2
+            y = target.top() + (target.height() - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+        else:
+            painter.setPen(QPen(QColor("#cccccc"), 1, Qt.PenStyle.DashLine))
+            painter.setBrush(QColor("#e0e0e0"))
+            painter.drawRoundedRect(rects['image'], 5, 5)
+            painter.setPen(QColor("#888888"))
+            painter.drawText(rects['image'], Qt.AlignmentFlag.AlignCenter, "Image\nNot Found")
+
+        font.setPixelSize(14)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("#333333"))
+        painter.drawText(rects['name'], Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap,
+                         f"{product['material']}: {product['name']}{stock_text(stock)}")
+        painter.setPen(QColor("#222222"))
+        painter.drawText(rects['price'], Qt.AlignmentFlag.AlignCenter, f"{product['price']} php")
+
+        font.setPixelSize(12)
+        font.setBold(False)
+        painter.setFont(font)
+        painter.setPen(QColor("#cccccc"))
+        painter.setBrush(QColor("#ffffff"))
+        for name in ('color', 'minus', 'quantity', 'plus'):
+            painter.drawRect(rects[name])
+        painter.setPen(QColor("#000000"))
+        painter.drawText(rects['color'].adjusted(6, 0, -16, 0), Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
+                         index.data(ColorRole))
+        painter.drawText(rects['color'].adjusted(0, 0, -4, 0), Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight, "▾")
+        painter.drawText(rects['minus'], Qt.AlignmentFlag.AlignCenter, "−")
+        painter.drawText(rects['quantity'], Qt.AlignmentFlag.AlignCenter, str(index.data(QuantityRole)))
+        painter.drawText(rects['plus'], Qt.AlignmentFlag.AlignCenter, "+")
+
+        sold_out = stock == 0
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#cccccc" if sold_out else "#28a745"))
+        painter.drawRoundedRect(rects['button'], 5, 5)
+        painter.setPen(QColor("#666666" if sold_out else "#ffffff"))
+        painter.drawText(rects['button'], Qt.AlignmentFlag.AlignCenter, "Out of Stock" if sold_out else "Add to Cart")
+        painter.restore()
+
+    def hit_test(self, rect, pos):
+        for name in ('color', 'minus', 'plus', 'button'):
+            if card_rects(rect)[name].contains(pos):
+                return name
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.Type.MouseButtonRelease or event.button() != Qt.MouseButton.LeftButton:
+            return super().editorEvent(event, model, option, index)
+        hotspot = self.hit_test(option.rect, event.position().toPoint())
+        quantity = index.data(QuantityRole)
+        if hotspot == 'minus':
+            model.set_choice(index, quantity=quantity - 1)
+        elif hotspot == 'plus':
+            model.set_choice(index, quantity=quantity + 1)
+        elif hotspot == 'color':
+            self.choose_color(index, option.rect)
+        elif hotspot == 'button':
+            if index.data(StockRole) != 0:
+                self.add_requested.emit(index.data(ProductRole), index.data(ColorRole), quantity)
+        else:
+            return False
+        return True
+
+    def choose_color(self, index, rect):
+        view = self.parent()
+        menu = QMenu(view)
+        for color in index.data(ProductRole)['colors']:
+            action = menu.addAction(color)
+            action.setCheckable(True)
+            action.setChecked(color == index.data(ColorRole))
+        chosen = menu.exec(view.viewport().mapToGlobal(card_rects(rect)['color'].bottomLeft()))
+        if chosen is not None:
+            index.model().set_choice(index, color=chosen.text())
+
+
+class ProductGridView(QListView):
+    """Wrapping grid of product cards; only cards in view are painted."""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setUniformItemSizes(True)
+        self.setSpacing(8)
+        self.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setMouseTracking(True)
+        self.setStyleSheet("QListView { border: none; background: #ffffff; }")
+        self.delegate = ProductCardDelegate(self)
+        self.setItemDelegate(self.delegate)
+        self.setModel(model)
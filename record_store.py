@@ -0,0 +1,230 @@
+import json
+import os
+import threading
+
+_USERNAME_PREFIX = b'{"username": "'
+# tombstones are written as {"username": ..., "deleted": true}
+_DELETED_SUFFIX = b', "deleted": true}\n'
+
+
+def _record_username(line):
+    # records are written with the username first; slice it out rather than
+    # parse the whole line, unless it needs unescaping
+    if line.startswith(_USERNAME_PREFIX):
+        end = line.find(b'"', len(_USERNAME_PREFIX))
+        name = line[len(_USERNAME_PREFIX):end]
+        if end > 0 and b'\\' not in name:
+            return name.decode('utf-8')
+    try:
+        return json.loads(line)['username']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class RecordLog:
+    """Index over an append-only log of JSON records keyed by username.
+
+    Only byte offsets are kept in memory (username -> start of its latest
+    record), so a lookup is a dict hit plus one short read. Writing appends
+    whole lines with O_APPEND; other writers' appends are picked up by
+    reading just the new tail when the file's size or mtime changes.
+    hits/misses count lookups served from the index vs. ones that had to
+    read the log first. A legacy single-document file is imported the
+    first time the log is missing, then deleted, since it keeps passwords
+    in plaintext.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.hits = 0
+        self.misses = 0
+        self._offsets = {}
+        self._records = 0
+        self._read_to = 0
+        self._signature = None
+        self._lock = threading.RLock()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _sync(self):
+        signature = self._stat()
+        if signature is None and self.legacy_path and os.path.exists(self.legacy_path):
+            self._import_legacy()
+            signature = self._stat()
+        if signature == self._signature:
+            self.hits += 1
+            return
+        self.misses += 1
+        if (signature is None or self._signature is None or signature[0] != self._signature[0]
+                or signature[1] < self._read_to):
+            # first read, or the log was replaced (compacted): start over
+            self._offsets = {}
+            self._records = 0
+            self._read_to = 0
+        if signature is not None:
+            self._read_tail()
+        self._signature = signature
+
+    def _read_tail(self):
+        offsets = self._offsets
+        with open(self.path, 'rb') as f:
+            f.seek(self._read_to)
+            pos = self._read_to
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # a writer is mid-append; pick this record up next time
+                    break
+                username = _record_username(line)
+                if username is not None:
+                    if line.endswith(_DELETED_SUFFIX):
+                        offsets.pop(username, None)
+                    else:
+                        offsets[username] = pos
+                    self._records += 1
+                pos += len(line)
+        self._read_to = pos
+
+    def _read_record(self, offset):
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            record = json.loads(f.readline())
+        record.pop('username', None)
+        return record
+
+    def _import_legacy(self):
+        try:
+            with open(self.legacy_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._rewrite(self.legacy_records(data))
+        # no longer shipped; a copy left by an older install keeps plaintext passwords
+        try:
+            os.remove(self.legacy_path)
+        except OSError:
+            pass
+
+    def legacy_records(self, data):
+        """(username, record) pairs from the legacy file's contents."""
+        return data.items()
+
+    def _rewrite(self, records):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        # created owner-only like the log itself; os.open's mode only applies to a new file
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w') as f:
+            for username, record in records:
+                f.write(json.dumps({"username": username, **record}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def get(self, username):
+        with self._lock:
+            self._sync()
+            offset = self._offsets.get(username)
+            if offset is None:
+                return None
+            return self._read_record(offset)
+
+    def __contains__(self, username):
+        with self._lock:
+            self._sync()
+            return username in self._offsets
+
+    def __len__(self):
+        with self._lock:
+            self._sync()
+            return len(self._offsets)
+
+    def all(self):
+        with self._lock:
+            self._sync()
+            return {username: self._read_record(offset) for username, offset in self._offsets.items()}
+
+    def add(self, username, record):
+        """Append one record; replaces any earlier record for username."""
+        self.add_many([(username, record)])
+
+    def add_if_absent(self, username, record):
+        """Append a record for a username that has none; returns False,
+        writing nothing, when another writer took the name first."""
+        with self._lock:
+            self._sync()
+            if username in self._offsets:
+                return False
+            self.add_many([(username, record)])
+            return True
+
+    def add_many(self, records):
+        """Append (username, record) pairs with a single O_APPEND write."""
+        data = "".join(json.dumps({"username": username, **record}) + "\n" for username, record in records)
+        if not data:
+            return
+        data = data.encode('utf-8')
+        with self._lock:
+            # make sure a legacy customers.json is imported before the log exists
+            self._sync()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+            self._sync()
+
+    def remove(self, username):
+        """Append a tombstone; the username is gone from then on."""
+        self.add_many([(username, {"deleted": True})])
+
+    def compact(self):
+        """Rewrite the log with only the latest live record per username."""
+        with self._lock:
+            self._sync()
+            if self._records == len(self._offsets):
+                return
+            self._rewrite((username, self._read_record(offset)) for username, offset in self._offsets.items())
+            self._signature = None
+            self._sync()
+
+    def iter_lines(self):
+        """Yield (username, raw JSON line) for every customer's latest record,
+        scanning the log once so memory stays flat however many there are."""
+        with self._lock:
+            self._sync()
+            # a copy of the index (not of the records), so appends made
+            # during the scan cannot hide a customer's earlier record
+            offsets = dict(self._offsets)
+            end = self._read_to
+        if not end:
+            return
+        with open(self.path, 'rb') as f:
+            pos = 0
+            for line in f:
+                if pos >= end:
+                    break
+                username = _record_username(line)
+                if username is not None and offsets.get(username) == pos:
+                    yield username, line
+                pos += len(line)
+
+    def iter_records(self):
+        for username, line in self.iter_lines():
+            record = json.loads(line)
+            record.pop('username', None)
+            yield username, record
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "live": len(self._offsets),
+                "records": self._records}
@@ -0,0 +1,214 @@
+import re
+
+# how long the catalog search waits for typing to pause before querying
+SEARCH_DEBOUNCE_MS = 150
+
+# a match in a product's name outranks one in its category, material or colors
+FIELD_WEIGHTS = (("name", 8), ("category", 4), ("material", 2), ("colors", 1))
+EXACT_BONUS = 2
+FUZZY_PENALTY = 0.5
+# query tokens shorter than this are never fuzzy-matched
+FUZZY_MIN_LENGTH = 4
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_END = ''
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+def _trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_one_edit(a, b):
+    """True if a and b differ by at most one insertion, deletion,
+    substitution or adjacent transposition."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return (a[i + 1:] == b[i + 1:]
+                or (i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]))
+    return a[i:] == b[i + 1:]
+
+
+def _tiers(levels):
+    """Collapse {score: [id sets]} into disjoint {score: ids}, each id
+    kept only under the highest score it reached. The sets returned may
+    be the postings themselves and must not be modified."""
+    tiers, seen = {}, set()
+    scores = sorted(levels, reverse=True)
+    for score in scores:
+        sets = levels[score]
+        ids = sets[0] if len(sets) == 1 else set().union(*sets)
+        if seen:
+            ids = ids - seen
+        if ids:
+            tiers[score] = ids
+            if score != scores[-1]:
+                seen |= ids
+    return tiers
+
+
+class SearchIndex:
+    """Token index over product name, category, material and colors.
+
+    Query tokens match indexed tokens by prefix, found by walking a
+    character trie; with fuzzy on, tokens with no prefix match fall back
+    to indexed tokens sharing trigrams and within one edit. Postings are
+    kept as sets of integer ids per field weight, so scoring and ranking
+    are set operations rather than per-product loops. Products can be
+    added and removed one at a time."""
+
+    def __init__(self, products=()):
+        self._postings = {}   # token -> {weight: {id}}
+        self._trie = {}       # char -> child node; _END marks a whole token
+        self._trigrams = {}   # trigram -> {token}
+        self._documents = {}  # id -> {token: weight}
+        self._ids = {}        # sku -> id; ids follow insertion order and break ties
+        self._skus = []       # id -> sku, None once removed
+        for product in products:
+            self.add(product)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, sku):
+        return sku in self._ids
+
+    def add(self, product):
+        sku = product["sku"]
+        # an updated product keeps its id, and so its place among equally ranked results
+        doc_id = self._ids.get(sku)
+        if doc_id is None:
+            doc_id = self._ids[sku] = len(self._skus)
+            self._skus.append(sku)
+        else:
+            self._unindex(doc_id)
+        weights = {}
+        for field, weight in FIELD_WEIGHTS:
+            value = product.get(field, "")
+            for token in tokenize(" ".join(value) if isinstance(value, list) else value):
+                weights[token] = max(weights.get(token, 0), weight)
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._insert_token(token)
+            postings.setdefault(weight, set()).add(doc_id)
+        self._documents[doc_id] = weights
+
+    def remove(self, sku):
+        doc_id = self._ids.pop(sku, None)
+        if doc_id is not None:
+            self._unindex(doc_id)
+            self._skus[doc_id] = None
+
+    def _unindex(self, doc_id):
+        for token, weight in self._documents.pop(doc_id, {}).items():
+            postings = self._postings[token]
+            postings[weight].discard(doc_id)
+            if not postings[weight]:
+                del postings[weight]
+            if not postings:
+                del self._postings[token]
+                self._remove_token(token)
+    def _insert_token(self, token):
+        node = self._trie
+        for char in token:
+            node = node.setdefault(char, {})
+        node[_END] = token
+        for gram in _trigrams(token):
+            self._trigrams.setdefault(gram, set()).add(token)
+
+    def _remove_token(self, token):
+        path = [self._trie]
+        for char in token:
+            path.append(path[-1][char])
+        del path[-1][_END]
+        # prune nodes left with no tokens under them
+        for depth in range(len(token), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][token[depth - 1]]
+        for gram in _trigrams(token):
+            tokens = self._trigrams[gram]
+            tokens.discard(token)
+            if not tokens:
+                del self._trigrams[gram]
+
+    def prefix_tokens(self, prefix):
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        tokens, stack = [], [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == _END:
+                    tokens.append(child)
+                else:
+                    stack.append(child)
+        return tokens
+
+    def fuzzy_tokens(self, token):
+        grams = _trigrams(token)
+        shared = {}
+        for gram in grams:
+            for candidate in self._trigrams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        # one edit changes at most three trigrams
+        needed = len(grams) - 3
+        return [candidate for candidate, count in shared.items()
+                if count >= needed and _within_one_edit(token, candidate)]
+
+    def _scores(self, token, fuzzy):
+        levels = {}
+        for indexed in self.prefix_tokens(token):
+            factor = EXACT_BONUS if indexed == token else 1
+            for weight, ids in self._postings[indexed].items():
+                levels.setdefault(weight * factor, []).append(ids)
+        if not levels and fuzzy and len(token) >= FUZZY_MIN_LENGTH:
+            for indexed in self.fuzzy_tokens(token):
+                for weight, ids in self._postings[indexed].items():
+                    levels.setdefault(weight * FUZZY_PENALTY, []).append(ids)
+        return _tiers(levels)
+
+    def search(self, text, fuzzy=True, limit=None):
+        """SKUs matching every word of text, best first. An empty query
+        returns None, meaning no search filter applies."""
+        tokens = list(dict.fromkeys(tokenize(text)))
+        if not tokens:
+            return None
+        total = None
+        # narrowest token first, so the running intersection stays small
+        for tiers in sorted((self._scores(token, fuzzy) for token in tokens),
+                            key=lambda tiers: sum(map(len, tiers.values()))):
+            if total is None:
+                total = tiers
+                continue
+            combined = {}
+            for score, ids in total.items():
+                for other_score, other_ids in tiers.items():
+                    common = ids & other_ids
+                    if common:
+                        combined.setdefault(score + other_score, set()).update(common)
+            total = combined
+            if not total:
+                break
+        ranked = []
+        for score in sorted(total, reverse=True):
+            ranked.extend(sorted(total[score]))
+            if limit is not None and len(ranked) >= limit:
+                del ranked[limit:]
+                break
+        return list(map(self._skus.__getitem__, ranked))
@@ -0,0 +1,140 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+# remembered sessions and the key that signs them, so a relaunch can resume
+SESSIONS_PATH = os.path.join(CONFIG_DIR, 'sessions.json')
+SESSION_KEY_PATH = os.path.join(CONFIG_DIR, 'session.key')
+# the old "remember me" file, which kept the admin password in clear
+LEGACY_REMEMBER_PATH = os.path.join(CONFIG_DIR, 'remember.json')
+
+# seconds a session stays valid after login
+SESSION_TTL = float(os.getenv('SISIT_SESSION_TTL', str(8 * 3600)))
+
+# Tokens look like <role>.<username b64>.<expires>.<nonce>.<signature>, signed
+# with HMAC-SHA256. Only sessions issued (and not revoked) by this app are
+# honoured: a token must both verify and be present in the session table.
+
+_lock = threading.RLock()
+_key = None
+_sessions = None
+
+
+def _load_key():
+    global _key
+    if _key is None:
+        secret = os.getenv('SISIT_SESSION_SECRET')
+        if secret:
+            _key = hashlib.sha256(secret.encode('utf-8')).digest()
+        else:
+            try:
+                with open(SESSION_KEY_PATH, 'rb') as f:
+                    _key = f.read()
+            except OSError:
+                _key = b''
+            if len(_key) < 32:
+                _key = os.urandom(32)
+                try:
+                    os.makedirs(CONFIG_DIR, exist_ok=True)
+                    fd = os.open(SESSION_KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(_key)
+                except OSError as e:
+                    print(f"[WARN] Could not store session key, sessions will not survive a restart: {e}")
+    return _key
+
+
+def _table():
+    global _sessions
+    if _sessions is None:
+        _sessions = {}
+        try:
+            with open(SESSIONS_PATH, 'r') as f:
+                _sessions = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if os.path.exists(LEGACY_REMEMBER_PATH):
+            try:
+                os.remove(LEGACY_REMEMBER_PATH)
+            except OSError:
+                pass
+    return _sessions
+
+
+def _save():
+    remembered = {token: session for token, session in _sessions.items() if session.get('remember')}
+    try:
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        tmp_path = SESSIONS_PATH + '.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(remembered, f)
+        os.replace(tmp_path, SESSIONS_PATH)
+    except OSError as e:
+        print(f"[WARN] Could not save sessions: {e}")
+
+
+def _sign(payload):
+    return base64.urlsafe_b64encode(hmac.new(_load_key(), payload.encode('utf-8'), hashlib.sha256).digest()).decode('ascii').rstrip('=')
+
+
+def issue(role, username, profile=None, remember=False, ttl=None):
+    """Start a session and return its token. Remembered sessions are written
+    to disk so they survive a restart; others live only in memory."""
+    expires = int(time.time() + (ttl if ttl is not None else SESSION_TTL))
+    subject = base64.urlsafe_b64encode(username.encode('utf-8')).decode('ascii').rstrip('=')
+    nonce = base64.urlsafe_b64encode(os.urandom(12)).decode('ascii')
+    payload = f"{role}.{subject}.{expires}.{nonce}"
+    token = f"{payload}.{_sign(payload)}"
+    with _lock:
+        table = _table()
+        table[token] = {'role': role, 'username': username, 'profile': profile,
+                        'expires': expires, 'remember': remember}
+        if remember:
+            _save()
+    return token
+
+
+def validate(token):
+    """Return the session for a token, or None if it is forged, expired or revoked."""
+    if not token:
+        return None
+    payload, _, signature = token.rpartition('.')
+    if not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    with _lock:
+        session = _table().get(token)
+        if session is None:
+            return None
+        if session['expires'] <= time.time():
+            revoke(token)
+            return None
+        return session
+
+
+def find(role):
+    """Token of the newest valid session for a role, if any."""
+    with _lock:
+        candidates = [(session['expires'], token) for token, session in _table().items() if session['role'] == role]
+        for _, token in sorted(candidates, reverse=True):
+            if validate(token):
+                return token
+    return None
+
+
+def revoke(token):
+    with _lock:
+        session = _table().pop(token, None)
+        if session and session.get('remember'):
+            _save()
+
+
+def revoke_role(role):
+    with _lock:
+        for token in [token for token, session in _table().items() if session['role'] == role]:
+            revoke(token)
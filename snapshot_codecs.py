@@ -0,0 +1,325 @@
+import json
+import lzma
+import struct
+import sys
+import zlib
+from array import array
+
+# Compact snapshot formats. Every non-plain snapshot starts with a header:
+#   MAGIC (4 bytes) | format version (1 byte) | codec id (1 byte)
+# Plain JSON (the original format) has no header.
+
+MAGIC = b'SSNP'
+FORMAT_VERSION = 1
+
+CODEC_IDS = {
+    'json-zlib': 1,
+    'json-lzma': 2,
+    'binary': 3,
+}
+CODEC_NAMES = {v: k for k, v in CODEC_IDS.items()}
+CODECS = ('json',) + tuple(CODEC_IDS)
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+def encode_state(state, codec='json'):
+    if codec == 'json':
+        return json.dumps(state, indent=2).encode('utf-8')
+    if codec not in CODEC_IDS:
+        raise SnapshotFormatError(f"Unknown snapshot codec '{codec}'")
+
+    header = MAGIC + bytes((FORMAT_VERSION, CODEC_IDS[codec]))
+    if codec == 'binary':
+        return header + pack(state)
+    body = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    if codec == 'json-zlib':
+        return header + zlib.compress(body, 6)
+    return header + lzma.compress(body, preset=1)
+
+
+def detect_codec(data):
+    if data[:4] == MAGIC:
+        if len(data) < 6:
+            raise SnapshotFormatError("Truncated snapshot header")
+        if data[4] > FORMAT_VERSION:
+            raise SnapshotFormatError(f"Snapshot format version {data[4]} is newer than this build")
+        try:
+            return CODEC_NAMES[data[5]]
+        except KeyError:
+            raise SnapshotFormatError(f"Unknown snapshot codec id {data[5]}")
+    return 'json'
+
+
+def decode_state(data):
+    codec = detect_codec(data)
+    if codec == 'json':
+        return json.loads(data)
+    body = data[6:]
+    if codec == 'binary':
+        return unpack(body)
+    try:
+        if codec == 'json-zlib':
+            return json.loads(zlib.decompress(body))
+        return json.loads(lzma.decompress(body))
+    except (zlib.error, lzma.LZMAError, EOFError) as e:
+        raise SnapshotFormatError(f"Corrupt snapshot: {e}")
+
+
+# binary layout
+#
+# pack() writes a string table, a shape table (the key tuples of small
+# dicts) and then one tagged value. Lists of same-shaped dicts (orders,
+# cart lines) are stored column by column; int and string columns become
+# packed arrays of values / string-table indexes.
+
+T_NONE, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_LIST, T_RECORD, T_MAP = range(9)
+L_ANY, L_INT, L_STR, L_TABLE = range(4)
+
+# dicts with more keys than this are stored as key/value columns, not as a shape
+MAX_SHAPE_KEYS = 16
+
+_LITTLE = sys.byteorder == 'little'
+
+
+def _int_array(values):
+    lo, hi = min(values, default=0), max(values, default=0)
+    for code in ('b', 'h', 'i', 'q'):
+        bits = array(code).itemsize * 8
+        if -(1 << (bits - 1)) <= lo and hi < (1 << (bits - 1)):
+            return code, array(code, values)
+    return None, None
+
+
+def _to_le(arr):
+    if not _LITTLE:
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(code, raw):
+    arr = array(code)
+    arr.frombytes(raw)
+    if not _LITTLE:
+        arr.byteswap()
+    return arr
+
+
+class _Packer:
+    def __init__(self):
+        self.strings = {}
+        self.shapes = {}
+        self.out = bytearray()
+
+    def intern(self, s):
+        index = self.strings.get(s)
+        if index is None:
+            index = self.strings[s] = len(self.strings)
+        return index
+
+    def shape(self, keys):
+        index = self.shapes.get(keys)
+        if index is None:
+            index = self.shapes[keys] = len(self.shapes)
+        return index
+
+    def uint(self, n):
+        out = self.out
+        while n >= 0x80:
+            out.append((n & 0x7f) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def value(self, v):
+        out = self.out
+        if v is None:
+            out.append(T_NONE)
+        elif v is True:
+            out.append(T_TRUE)
+        elif v is False:
+            out.append(T_FALSE)
+        elif type(v) is int:
+            out.append(T_INT)
+            self.uint((v << 1) if v >= 0 else ((-v << 1) - 1))
+        elif type(v) is float:
+            out.append(T_FLOAT)
+            out += struct.pack('<d', v)
+        elif type(v) is str:
+            out.append(T_STR)
+            self.uint(self.intern(v))
+        elif isinstance(v, (list, tuple)):
+            out.append(T_LIST)
+            self.values(list(v))
+        elif isinstance(v, dict):
+            keys = tuple(v)
+            if len(keys) <= MAX_SHAPE_KEYS and all(type(k) is str for k in keys):
+                out.append(T_RECORD)
+                self.uint(self.shape(keys))
+                for k in keys:
+                    self.value(v[k])
+            else:
+                out.append(T_MAP)
+                self.values([str(k) for k in keys])
+                self.values(list(v.values()))
+        else:
+            raise SnapshotFormatError(f"Cannot pack value of type {type(v).__name__}")
+
+    def values(self, items):
+        out = self.out
+        n = len(items)
+        first = items[0] if items else None
+        kind = type(first)
+
+        if n and kind is int and all(type(x) is int for x in items):
+            code, arr = _int_array(items)
+            if code:
+                out.append(L_INT)
+                self.uint(n)
+                out += code.encode()
+                out += _to_le(arr)
+                return
+        elif n and kind is str and all(type(x) is str for x in items):
+            out.append(L_STR)
+            self.uint(n)
+            intern = self.intern
+            code, arr = _int_array([intern(x) for x in items])
+            out += code.encode()
+            out += _to_le(arr)
+            return
+        elif n > 1 and kind is dict:
+            keys = tuple(first)
+            # rows are rebuilt from the columns, so a table needs at least one
+            if keys and len(keys) <= MAX_SHAPE_KEYS and all(type(k) is str for k in keys) \
+                    and all(type(x) is dict and tuple(x) == keys for x in items):
+                out.append(L_TABLE)
+                self.uint(n)
+                self.uint(self.shape(keys))
+                for k in keys:
+                    self.values([x[k] for x in items])
+                return
+
+        out.append(L_ANY)
+        self.uint(n)
+        for x in items:
+            self.value(x)
+
+    def finish(self):
+        head = bytearray()
+        strings = [s.encode('utf-8') for s in self.strings]
+        head += struct.pack('<I', len(strings))
+        head += _to_le(array('I', [len(s) for s in strings]))
+        head += b''.join(strings)
+        head += struct.pack('<I', len(self.shapes))
+        for keys in self.shapes:
+            head += struct.pack('<H', len(keys))
+            head += _to_le(array('I', [self.strings[k] for k in keys]))
+        return bytes(head) + bytes(self.out)
+
+
+def pack(state):
+    packer = _Packer()
+    packer.value(state)
+    # shape keys go in the string table too
+    for keys in packer.shapes:
+        for k in keys:
+            packer.intern(k)
+    return packer.finish()
+
+
+class _Unpacker:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+        count = self.u32()
+        lengths = _from_le('I', self.take(4 * count))
+        strings = []
+        for length in lengths:
+            strings.append(str(self.take(length), 'utf-8'))
+        self.strings = strings
+        self.shapes = []
+        for _ in range(self.u32()):
+            nkeys = struct.unpack_from('<H', self.data, self.pos)[0]
+            self.pos += 2
+            self.shapes.append(tuple(strings[i] for i in _from_le('I', self.take(4 * nkeys))))
+
+    def take(self, n):
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return chunk
+
+    def u32(self):
+        n = struct.unpack_from('<I', self.data, self.pos)[0]
+        self.pos += 4
+        return n
+
+    def uint(self):
+        data = self.data
+        result = shift = 0
+        while True:
+            b = data[self.pos]
+            self.pos += 1
+            result |= (b & 0x7f) << shift
+            if b < 0x80:
+                return result
+            shift += 7
+
+    def array(self, n):
+        code = chr(self.data[self.pos])
+        self.pos += 1
+        size = array(code).itemsize
+        return _from_le(code, self.take(size * n))
+
+    def value(self):
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == T_NONE:
+            return None
+        if tag == T_TRUE:
+            return True
+        if tag == T_FALSE:
+            return False
+        if tag == T_INT:
+            z = self.uint()
+            return (z >> 1) if not z & 1 else -((z + 1) >> 1)
+        if tag == T_FLOAT:
+            v = struct.unpack_from('<d', self.data, self.pos)[0]
+            self.pos += 8
+            return v
+        if tag == T_STR:
+            return self.strings[self.uint()]
+        if tag == T_LIST:
+            return self.values()
+        if tag == T_RECORD:
+            keys = self.shapes[self.uint()]
+            return {k: self.value() for k in keys}
+        if tag == T_MAP:
+            keys = self.values()
+            return dict(zip(keys, self.values()))
+        raise SnapshotFormatError(f"Corrupt snapshot: unknown tag {tag}")
+
+    def values(self):
+        kind = self.data[self.pos]
+        self.pos += 1
+        n = self.uint()
+        if kind == L_INT:
+            return self.array(n).tolist()
+        if kind == L_STR:
+            strings = self.strings
+            return [strings[i] for i in self.array(n)]
+        if kind == L_TABLE:
+            keys = self.shapes[self.uint()]
+            columns = [self.values() for _ in keys]
+            return [dict(zip(keys, row)) for row in zip(*columns)]
+        if kind == L_ANY:
+            return [self.value() for _ in range(n)]
+        raise SnapshotFormatError(f"Corrupt snapshot: unknown list kind {kind}")
+
+
+def unpack(data):
+    try:
+        return _Unpacker(data).value()
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise SnapshotFormatError(f"Corrupt snapshot: {e}")
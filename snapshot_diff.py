@@ -0,0 +1,190 @@
+"""Compare two saved snapshots: stock deltas, added/removed orders and cart changes.
+
+    python snapshot_diff.py OLD NEW [--limit N]
+"""
+import argparse
+import os
+from collections import defaultdict, deque
+
+from migrations import migrate_state
+from persistence import SAVE_DIR, SECTIONS, load_file_state, read_manifest, read_section, section_hash
+from snapshot_codecs import decode_state
+
+
+def _manifest_sha(path):
+    name = os.path.basename(path)
+    for entry in reversed(read_manifest()):
+        if entry['file'] == name:
+            return entry.get('sha256')
+    return None
+
+
+def _read_pointer(path):
+    with open(path, 'rb') as f:
+        state = decode_state(f.read())
+    return state, state.pop('sections', None)
+
+
+def load_pair(old_path, new_path):
+    """Load two snapshots for comparison. Sections both deduplicated saves
+    share a blob for are skipped rather than read; returns (old, new, same)."""
+    old, old_sections = _read_pointer(old_path)
+    new, new_sections = _read_pointer(new_path)
+    if not (old_sections and new_sections):
+        old, new = load_file_state(old_path), load_file_state(new_path)
+        if old is None or new is None:
+            raise ValueError("Could not read one of the snapshots")
+        return old, new, set()
+
+    same = {name for name in SECTIONS if old_sections.get(name) and old_sections.get(name) == new_sections.get(name)}
+    for state, sections in ((old, old_sections), (new, new_sections)):
+        for name, section in sections.items():
+            if name not in same:
+                state[name] = read_section(section)
+    return migrate_state(old), migrate_state(new), same
+
+
+def _order_key(order):
+    # digest of the whole order, canonically encoded: equal orders share it
+    return section_hash(order)
+
+
+def _cart_key(item):
+    return (item.get('product'), item.get('category'), item.get('material'), item.get('color'))
+
+
+def diff_inventory(old, new):
+    """(product, old quantity, new quantity) for every product whose stock
+    differs; None stands for a product missing on that side."""
+    changes = []
+    for name, info in new.items():
+        before = old.get(name)
+        old_qty = before.get('quantity', 0) if before is not None else None
+        new_qty = info.get('quantity', 0)
+        if old_qty != new_qty:
+            changes.append((name, old_qty, new_qty))
+    for name, info in old.items():
+        if name not in new:
+            changes.append((name, info.get('quantity', 0), None))
+    return changes
+
+
+def diff_orders(old, new):
+    """Multiset difference of two order lists; returns (removed, added)."""
+    # histories are mostly the same orders in the same order, with a few
+    # removed and new ones appended: pair those off in one walk, and match
+    # what is left over as multisets keyed on each order's digest
+    unmatched, i, j = [], 0, 0
+    while i < len(old) and j < len(new):
+        if old[i] == new[j]:
+            j += 1
+        else:
+            unmatched.append(i)
+        i += 1
+    unmatched.extend(range(i, len(old)))
+
+    pending = defaultdict(deque)
+    for index in unmatched:
+        pending[_order_key(old[index])].append(index)
+    added = []
+    for index in range(j, len(new)):
+        matches = pending.get(_order_key(new[index]))
+        if matches:
+            matches.popleft()
+        else:
+            added.append(new[index])
+    removed = sorted(index for matches in pending.values() for index in matches)
+    return [old[index] for index in removed], added
+
+
+def diff_cart(old, new):
+    """(line key, old quantity, new quantity) for every cart line that changed."""
+    totals = defaultdict(lambda: [0, 0])
+    for side, items in ((0, old), (1, new)):
+        for item in items:
+            totals[_cart_key(item)][side] += item.get('quantity', 0)
+    return [(key, before, after) for key, (before, after) in totals.items() if before != after]
+
+
+def diff_snapshots(old_path, new_path):
+    diff = {'inventory': [], 'orders_removed': [], 'orders_added': [], 'cart': [], 'active_user': None}
+    old_sha = _manifest_sha(old_path)
+    if old_sha and old_sha == _manifest_sha(new_path):
+        return diff
+
+    old, new, same = load_pair(old_path, new_path)
+    if 'inventory' not in same:
+        diff['inventory'] = diff_inventory(old.get('inventory') or {}, new.get('inventory') or {})
+    if 'orders' not in same:
+        diff['orders_removed'], diff['orders_added'] = diff_orders(old.get('orders') or [], new.get('orders') or [])
+    if 'cart_items' not in same:
+        diff['cart'] = diff_cart(old.get('cart_items') or [], new.get('cart_items') or [])
+    if old.get('active_user') != new.get('active_user'):
+        diff['active_user'] = (old.get('active_user'), new.get('active_user'))
+    return diff
+
+
+def _describe_order(order):
+    buyer = order.get('buyer')
+    if isinstance(buyer, dict):
+        buyer = buyer.get('username')
+    details = " ".join(str(order.get(key)) for key in ('color', 'material') if order.get(key))
+    return f"{buyer or '?'}: {order.get('quantity', 0)} x {order.get('product')} {details}".rstrip()
+
+
+def _describe_user(user):
+    if isinstance(user, dict):
+        return user.get('username') or '?'
+    return user or 'nobody'
+
+
+def format_diff(diff, limit=50):
+    """Render a diff as text lines, showing at most `limit` entries per section."""
+    lines = []
+
+    def section(title, entries, describe):
+        if not entries:
+            return
+        lines.append(f"{title} ({len(entries)})")
+        lines.extend("  " + describe(entry) for entry in entries[:limit])
+        if len(entries) > limit:
+            lines.append(f"  ... {len(entries) - limit} more")
+
+    def stock(change):
+        name, before, after = change
+        if before is None:
+            return f"+ {name}: {after} (new product)"
+        if after is None:
+            return f"- {name}: {before} (removed)"
+        return f"  {name}: {before} -> {after} ({after - before:+d})"
+
+    def cart_line(change):
+        key, before, after = change
+        name = " ".join(str(part) for part in key if part)
+        return f"  {name}: {before} -> {after} ({after - before:+d})"
+
+    section("Stock changes", diff['inventory'], stock)
+    section("Orders added", diff['orders_added'], lambda order: "+ " + _describe_order(order))
+    section("Orders removed", diff['orders_removed'], lambda order: "- " + _describe_order(order))
+    section("Cart changes", diff['cart'], cart_line)
+    if diff['active_user']:
+        before, after = diff['active_user']
+        lines.append(f"Active user: {_describe_user(before)} -> {_describe_user(after)}")
+    return lines or ["No differences"]
+
+
+def _resolve(path):
+    if os.path.exists(path):
+        return path
+    return os.path.join(SAVE_DIR, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old", help="older snapshot (path or file name in save_files/)")
+    parser.add_argument("new", help="newer snapshot (path or file name in save_files/)")
+    parser.add_argument("--limit", type=int, default=50, help="entries shown per section")
+    args = parser.parse_args()
+
+    for line in format_diff(diff_snapshots(_resolve(args.old), _resolve(args.new)), args.limit):
+        print(line)
@@ -0,0 +1,210 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from catalog import get_catalog
+from migrations import SCHEMA_VERSION
+from stream_loader import LazyOrders, ORDER_CHUNK_SIZE
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'save_files', 'sisit.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    name TEXT PRIMARY KEY,
+    type TEXT,
+    quantity INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cart_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product TEXT,
+    category TEXT,
+    material TEXT,
+    color TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cart_by_line ON cart_items (product, category, material, color);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_conn = None
+_lock = threading.RLock()
+
+def get_connection():
+    global _conn
+    with _lock:
+        if _conn is None:
+            os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+            # shared by the GUI thread and background savers, serialized by _lock
+            _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            _conn.execute('PRAGMA journal_mode=WAL')
+            _conn.execute('PRAGMA synchronous=NORMAL')
+            _conn.executescript(SCHEMA)
+            _prepare(_conn)
+        return _conn
+
+def _stored_schema(cur):
+    row = cur.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    # databases written before the version was recorded hold schema 2 names
+    return json.loads(row[0]) if row else 2
+
+def _prepare(conn):
+    """Rename products stored under a pre-schema-3 spelling to their SKU,
+    then add any catalog product the database lacks at its starting stock."""
+    with conn:
+        cur = conn.cursor()
+        if _stored_schema(cur) < 3:
+            catalog = get_catalog()
+            for (name,) in cur.execute('SELECT name FROM products').fetchall():
+                sku = catalog.canonical_sku(name)
+                if sku == name:
+                    continue
+                # as in migrations._v2_to_v3, a row already under the SKU wins
+                if cur.execute('SELECT 1 FROM products WHERE name = ?', (sku,)).fetchone():
+                    cur.execute('DELETE FROM products WHERE name = ?', (name,))
+                else:
+                    cur.execute('UPDATE products SET name = ? WHERE name = ?', (sku, name))
+        cur.executemany('INSERT OR IGNORE INTO products (name, type, quantity) VALUES (?, ?, ?)',
+                        [(name, info['type'], info['quantity'])
+                         for name, info in get_catalog().initial_inventory().items()])
+        _set_meta(cur, 'schema_version', SCHEMA_VERSION)
+
+def close():
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+def _insert_order(cur, order):
+    cur.execute('INSERT INTO orders (data) VALUES (?)', (json.dumps(order),))
+
+def _insert_cart_line(cur, item):
+    cur.execute('INSERT INTO cart_items (product, category, material, color, data) VALUES (?, ?, ?, ?, ?)',
+                (item.get('product'), item.get('category'), item.get('material'), item.get('color'),
+                 json.dumps(item)))
+
+def _set_meta(cur, key, value):
+    cur.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+def save_state(inventory_data, orders, active_user=None, cart_items=None):
+    """Replace the stored state with a full copy in one transaction."""
+    # a lazily loaded history reads from the orders table, so read it before clearing that
+    orders = list(orders)
+    conn = get_connection()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    with _lock, conn:
+        cur = conn.cursor()
+        cur.execute('DELETE FROM products')
+        cur.execute('DELETE FROM orders')
+        cur.execute('DELETE FROM cart_items')
+        cur.executemany('INSERT INTO products (name, type, quantity) VALUES (?, ?, ?)',
+                        [(name, info.get('type', ''), int(info.get('quantity', 0)))
+                         for name, info in inventory_data.items()])
+        for order in orders:
+            _insert_order(cur, order)
+        for item in cart_items or []:
+            _insert_cart_line(cur, item)
+        _set_meta(cur, 'active_user', active_user)
+        _set_meta(cur, 'saved_at', timestamp)
+        _set_meta(cur, 'schema_version', SCHEMA_VERSION)
+    return DB_PATH
+
+def _order_chunks(last_id, chunk_size=ORDER_CHUNK_SIZE):
+    # orders up to last_id, a chunk per query; later rows are checkouts the
+    # caller already holds in memory
+    after = 0
+    while True:
+        conn = get_connection()
+        with _lock:
+            rows = conn.execute('SELECT id, data FROM orders WHERE id > ? AND id <= ? ORDER BY id LIMIT ?',
+                                (after, last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        after = rows[-1][0]
+        yield [json.loads(data) for _, data in rows]
+
+def load_state(lazy_orders=False):
+    """The stored state. With lazy_orders the order history is a LazyOrders
+    read from the database as it is used."""
+    conn = get_connection()
+    with _lock:
+        if conn.execute('SELECT COUNT(*) FROM products').fetchone()[0] == 0:
+            return None
+        inventory = {name: {'type': ptype, 'quantity': qty}
+                     for name, ptype, qty in conn.execute('SELECT name, type, quantity FROM products ORDER BY rowid')}
+        if lazy_orders:
+            last_id, count = conn.execute('SELECT MAX(id), COUNT(*) FROM orders').fetchone()
+            orders = LazyOrders(lambda: _order_chunks(last_id or 0), count)
+        else:
+            orders = [json.loads(data) for (data,) in conn.execute('SELECT data FROM orders ORDER BY id')]
+        cart = [json.loads(data) for (data,) in conn.execute('SELECT data FROM cart_items ORDER BY id')]
+        meta = {key: json.loads(value) for key, value in conn.execute('SELECT key, value FROM meta')}
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'inventory': inventory,
+        'orders': orders,
+        'active_user': meta.get('active_user'),
+        'cart_items': cart,
+        'saved_at': meta.get('saved_at'),
+    }
+
+def load_inventory():
+    conn = get_connection()
+    with _lock:
+        rows = conn.execute('SELECT name, type, quantity FROM products ORDER BY rowid').fetchall()
+    return {name: {'type': ptype, 'quantity': qty} for name, ptype, qty in rows}
+
+def set_stock(product, quantity):
+    catalog = get_catalog()
+    product = catalog.canonical_sku(product)
+    conn = get_connection()
+    with _lock, conn:
+        cur = conn.execute('UPDATE products SET quantity = ? WHERE name = ?', (quantity, product))
+        if cur.rowcount == 0:
+            info = catalog.get(product)
+            conn.execute('INSERT INTO products (name, type, quantity) VALUES (?, ?, ?)',
+                         (product, info['category'] if info else '', quantity))
+
+def apply_change(record):
+    """Apply one journal record (see persistence.apply_journal_record) in place."""
+    op = record.get('op')
+    if op == 'stock':
+        set_stock(record['product'], record['quantity'])
+        return
+
+    conn = get_connection()
+    with _lock, conn:
+        cur = conn.cursor()
+        if op in ('cart_add', 'cart_remove'):
+            item = record['item']
+            key = (item.get('product'), item.get('category'), item.get('material'), item.get('color'))
+            row = cur.execute('SELECT id, data FROM cart_items WHERE product IS ? AND category IS ? '
+                              'AND material IS ? AND color IS ? ORDER BY id LIMIT 1', key).fetchone()
+            if op == 'cart_remove':
+                if row:
+                    cur.execute('DELETE FROM cart_items WHERE id = ?', (row[0],))
+            elif row:
+                line = json.loads(row[1])
+                line['quantity'] = line.get('quantity', 0) + item['quantity']
+                line['total'] = record.get('line_total', line.get('total'))
+                cur.execute('UPDATE cart_items SET data = ? WHERE id = ?', (json.dumps(line), row[0]))
+            else:
+                _insert_cart_line(cur, item)
+        elif op == 'checkout':
+            cur.execute('INSERT INTO orders (data) SELECT data FROM cart_items ORDER BY id')
+            cur.execute('DELETE FROM cart_items')
+        elif op == 'orders_remove':
+            for index in sorted(record['indexes'], reverse=True):
+                cur.execute('DELETE FROM orders WHERE id = (SELECT id FROM orders ORDER BY id LIMIT 1 OFFSET ?)',
+                            (index,))
+        elif op == 'user':
+            _set_meta(cur, 'active_user', record.get('user'))
@@ -1,53 +1,9 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QGraphicsOpacityEffect, QPushButton, QGraphicsDropShadowEffect
 from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer
-from PyQt6.QtGui import QPixmap, QFont, QColor
+from PyQt6.QtGui import QFont, QColor
 import os
-from ui_views import _create_base_login_widget
-
-def set_login_background(widget):
-
-
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    bg_path = os.path.join(base_dir, "assets", "background_photo.png")
-
-    if not os.path.exists(bg_path):
-        print("Background image not found:", bg_path)
-        return
-
-
-    bg_label = QLabel(widget)
-    bg_label.setScaledContents(True)
-    bg_label.lower()
-    bg_label.setGeometry(0, 0, widget.width(), widget.height())
-
-
-    pixmap = QPixmap(bg_path)
-    bg_label.setPixmap(
-        pixmap.scaled(
-            widget.size(),
-            Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-            Qt.TransformationMode.SmoothTransformation
-        )
-    )
-
-    widget._bg_label = bg_label
-    widget._bg_pixmap = pixmap
-
-    # Update on resize
-    def resize_event(event):
-        if hasattr(widget, "_bg_label") and hasattr(widget, "_bg_pixmap"):
-            widget._bg_label.setGeometry(0, 0, widget.width(), widget.height())
-            widget._bg_label.setPixmap(
-                widget._bg_pixmap.scaled(
-                    widget.size(),
-                    Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-            )
-        event.accept()
-
-    widget.resizeEvent = resize_event
-
+from ui_views import _create_base_login_widget, set_login_background
+from pixmap_cache import cached_pixmap
 
 def create_startup_splash(parent=None):
 
@@ -64,17 +20,13 @@ def create_startup_splash(parent=None):
     image_path = os.path.join(base_dir, "assets", "startup_logo.png")
 
     print("Loading splash image from:", image_path)
-    pixmap = QPixmap(image_path)
+    pixmap = cached_pixmap(image_path, 400)
 
     if pixmap.isNull():
         logo.setText("Could not load image.\n" + image_path)
         logo.setStyleSheet("font-size: 16px; color: red;")
     else:
-        logo.setPixmap(
-            pixmap.scaled(400, 400,
-                          Qt.AspectRatioMode.KeepAspectRatio,
-                          Qt.TransformationMode.SmoothTransformation)
-        )
+        logo.setPixmap(pixmap)
 
     layout.addWidget(logo, alignment=Qt.AlignmentFlag.AlignCenter)
 
@@ -107,14 +59,10 @@ def create_mode_select_view(parent=None):
     base_dir = os.path.dirname(os.path.abspath(__file__))
     icon_path = os.path.join(base_dir, "assets", "login_icon.png")
 
-    pixmap = QPixmap(icon_path)
+    pixmap = cached_pixmap(icon_path, 80)
 
     if not pixmap.isNull():
-        icon_label.setPixmap(
-            pixmap.scaled(80, 80,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation)
-        )
+        icon_label.setPixmap(pixmap)
     layout.addWidget(icon_label, alignment=Qt.AlignmentFlag.AlignCenter)
 
     # Title
@@ -0,0 +1,331 @@
+import codecs
+import copy
+import json
+import lzma
+import re
+import zlib
+
+from snapshot_codecs import MAGIC, detect_codec, decode_state, SnapshotFormatError
+
+READ_SIZE = 64 * 1024
+ORDER_CHUNK_SIZE = 1000
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def iter_text(path):
+    """Yield a snapshot or blob file as decoded JSON text, piece by piece.
+    Returns None for formats that cannot be streamed (binary)."""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    codec = 'json' if head[:4] != MAGIC else detect_codec(head)
+    if codec == 'binary':
+        return None
+    return _iter_text(path, codec)
+
+
+def _iter_text(path, codec):
+    text = codecs.getincrementaldecoder('utf-8')()
+    if codec == 'json-zlib':
+        unpacker = zlib.decompressobj()
+    elif codec == 'json-lzma':
+        unpacker = lzma.LZMADecompressor()
+    else:
+        unpacker = None
+
+    with open(path, 'rb') as f:
+        if unpacker:
+            f.seek(6)
+        while True:
+            raw = f.read(READ_SIZE)
+            if not raw:
+                break
+            if unpacker:
+                try:
+                    raw = unpacker.decompress(raw)
+                except (zlib.error, lzma.LZMAError) as e:
+                    raise SnapshotFormatError(f"Corrupt snapshot: {e}")
+            yield text.decode(raw)
+    yield text.decode(b'', final=True)
+
+
+class _JsonStream:
+    """Just enough of an incremental JSON reader to walk the top level of a
+    snapshot and the elements of one array without holding the whole text."""
+
+    def __init__(self, pieces):
+        self.pieces = iter(pieces)
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        piece = next(self.pieces, None)
+        if piece is None:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + piece
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise SnapshotFormatError(f"Corrupt snapshot: expected '{char}'")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self.fill():
+                    raise SnapshotFormatError("Corrupt snapshot: truncated JSON")
+                continue
+            # a number at the very end of the buffer may continue in the next piece
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        """Iterate the array starting at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise SnapshotFormatError("Corrupt snapshot: expected ',' or ']'")
+
+    def members(self, stream_key):
+        """Iterate the top-level object as (key, value) pairs; the value of
+        stream_key is handed out as an item iterator, which must be consumed
+        before the next pair is read."""
+        self.expect('{')
+        if self.peek() == '}':
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            if key == stream_key and self.peek() == '[':
+                yield key, self.items()
+            else:
+                yield key, self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise SnapshotFormatError("Corrupt snapshot: expected ',' or '}'")
+
+
+def _chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_array_file(path, chunk_size=ORDER_CHUNK_SIZE):
+    """Yield the elements of a file holding one JSON array, in chunks."""
+    pieces = iter_text(path)
+    if pieces is None:
+        with open(path, 'rb') as f:
+            items = decode_state(f.read())
+        yield from _chunked(items, chunk_size)
+        return
+    yield from _chunked(_JsonStream(pieces).items(), chunk_size)
+
+
+def iter_member_file(path, key, chunk_size=ORDER_CHUNK_SIZE):
+    """Yield the elements of the top-level array `key` of a snapshot file, in chunks."""
+    pieces = iter_text(path)
+    if pieces is None:
+        with open(path, 'rb') as f:
+            items = decode_state(f.read()).get(key) or []
+        yield from _chunked(items, chunk_size)
+        return
+    for name, value in _JsonStream(pieces).members(key):
+        if name == key:
+            yield from _chunked(value, chunk_size)
+            return
+
+
+def read_without_member(path, key):
+    """Read a snapshot's top-level fields except `key`, whose elements are
+    parsed and dropped one at a time. Returns None for unstreamable formats."""
+    pieces = iter_text(path)
+    if pieces is None:
+        return None
+    header = {}
+    for name, value in _JsonStream(pieces).members(key):
+        if name == key and not isinstance(value, list):
+            for _ in value:
+                pass
+        else:
+            header[name] = value
+    return header
+
+
+class LazyOrders:
+    """Order history that is read from disk a chunk at a time as it is used.
+
+    Reading by index or iterating only materializes what has been reached;
+    appending keeps new orders in memory, as the tail, next to the unread
+    history. Any other change loads everything and behaves like a plain
+    list from then on.
+
+    An instance reads through one iterator and is meant for one thread; a
+    deep copy of untouched history opens its own and shares nothing with
+    the original, so it can be handed to another thread.
+    """
+
+    def __init__(self, open_chunks, total=None, digest=None):
+        self._open_chunks = open_chunks
+        self._chunks = None
+        self._loaded = []
+        self._exhausted = False
+        self._appended = []
+        self._total = total
+        self._modified = False
+        # identifies the untouched history on disk, so saves can reuse it
+        self.digest = digest
+
+    def _pull(self):
+        if self._exhausted:
+            return False
+        if self._chunks is None:
+            self._chunks = self._open_chunks()
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            self._total = len(self._loaded)
+            return False
+        self._loaded.extend(chunk)
+        return True
+
+    def _ensure(self, count):
+        while len(self._loaded) < count and self._pull():
+            pass
+
+    def _history_length(self):
+        if self._total is None:
+            while self._pull():
+                pass
+        return self._total
+
+    def materialize(self):
+        """Every order as a list; the history is read in but kept apart
+        from the tail, so the instance stays unmodified."""
+        while self._pull():
+            pass
+        if self._appended:
+            return self._loaded + self._appended
+        return self._loaded
+
+    @property
+    def loaded_count(self):
+        return len(self._loaded)
+
+    @property
+    def modified(self):
+        """True once the history itself was changed rather than appended to."""
+        return self._modified
+
+    @property
+    def tail(self):
+        """Orders appended since the history was read."""
+        return self._appended
+
+    def __len__(self):
+        if self._exhausted:
+            return len(self._loaded) + len(self._appended)
+        return self._history_length() + len(self._appended)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) or index < 0:
+            return self.materialize()[index]
+        self._ensure(index + 1)
+        if index < len(self._loaded):
+            return self._loaded[index]
+        if self._exhausted:
+            return self._appended[index - len(self._loaded)]
+        raise IndexError('order index out of range')
+
+    def __iter__(self):
+        index = 0
+        while True:
+            if index < len(self._loaded):
+                yield self._loaded[index]
+                index += 1
+            elif not self._pull():
+                break
+        yield from list(self._appended)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def append(self, order):
+        self._appended.append(order)
+
+    def extend(self, orders):
+        self._appended.extend(orders)
+
+    def _changed(self):
+        while self._pull():
+            pass
+        self._loaded.extend(self._appended)
+        self._appended = []
+        self._total = len(self._loaded)
+        self._modified = True
+        self.digest = None
+        return self._loaded
+
+    def pop(self, index=-1):
+        return self._changed().pop(index)
+
+    def remove(self, order):
+        self._changed().remove(order)
+
+    def insert(self, index, order):
+        self._changed().insert(index, order)
+
+    def clear(self):
+        self._changed().clear()
+
+    def __setitem__(self, index, order):
+        self._changed()[index] = order
+
+    def __delitem__(self, index):
+        del self._changed()[index]
+
+    def __deepcopy__(self, memo):
+        if self._modified:
+            return copy.deepcopy(self._loaded, memo)
+        # the history on disk is unchanged: the copy re-reads it through
+        # its own iterator and only the tail is copied
+        duplicate = LazyOrders(self._open_chunks, self._total, self.digest)
+        duplicate._appended = copy.deepcopy(self._appended, memo)
+        return duplicate
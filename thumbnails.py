@@ -0,0 +1,137 @@
+import hashlib
+import os
+
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from pixmap_cache import cache_key, get_pixmap_cache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(BASE_DIR, 'assets')
+# pre-scaled product images, named <source digest>-<size>-<source mtime>.png
+THUMBNAIL_DIR = os.path.join(BASE_DIR, 'cache', 'thumbnails')
+
+# preferred first when one name has several image files
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg')
+
+_asset_index = None
+
+
+def asset_index():
+    """{lowercased file stem: path} for every image in assets/, scanned once."""
+    global _asset_index
+    if _asset_index is None:
+        found = {}
+        try:
+            names = sorted(os.listdir(ASSETS_DIR))
+        except OSError:
+            names = []
+        for filename in names:
+            stem, ext = os.path.splitext(filename)
+            if ext.lower() not in IMAGE_EXTENSIONS:
+                continue
+            rank = IMAGE_EXTENSIONS.index(ext.lower())
+            current = found.get(stem.lower())
+            if current is None or rank < current[0]:
+                found[stem.lower()] = (rank, os.path.join(ASSETS_DIR, filename))
+        _asset_index = {stem: path for stem, (_, path) in found.items()}
+    return _asset_index
+
+
+def find_asset(name):
+    return asset_index().get(str(name).lower())
+
+
+def _cache_path(path, size):
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    mtime = os.stat(path).st_mtime_ns
+    return os.path.join(THUMBNAIL_DIR, f"{digest}-{size}-{mtime}.png"), f"{digest}-{size}-"
+
+
+def load_thumbnail(path, size):
+    """A size x size (aspect kept) QImage of path, from the disk cache when
+    the source has not changed since it was scaled. Safe off the GUI thread."""
+    try:
+        cache_path, prefix = _cache_path(path, size)
+    except OSError:
+        return QImage()
+    image = QImage(cache_path)
+    if not image.isNull():
+        return image
+
+    image = QImage(path)
+    if image.isNull():
+        return image
+    image = image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    try:
+        os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        if image.save(tmp_path, 'PNG'):
+            os.replace(tmp_path, cache_path)
+        # drop thumbnails of earlier versions of the same source
+        for filename in os.listdir(THUMBNAIL_DIR):
+            if filename.startswith(prefix) and filename.endswith('.png') and filename != os.path.basename(cache_path):
+                os.remove(os.path.join(THUMBNAIL_DIR, filename))
+    except OSError as e:
+        print(f"[WARN] Could not cache thumbnail for {path}: {e}")
+    return image
+
+
+class _ThumbnailJob(QRunnable):
+    def __init__(self, loader, key, name, path, size):
+        super().__init__()
+        self.loader = loader
+        self.key = key
+        self.name = name
+        self.path = path
+        self.size = size
+
+    def run(self):
+        self.loader._loaded.emit(self.key, self.name, load_thumbnail(self.path, self.size))
+
+
+class ThumbnailLoader(QObject):
+    """Decodes and scales product images on a thread pool. pixmap() answers
+    at once with what is ready in the shared pixmap cache and queues the
+    rest; thumbnail_ready fires with the product name as each one arrives."""
+
+    thumbnail_ready = pyqtSignal(str)
+    # worker -> GUI thread; QPixmaps may only be made on the GUI thread
+    _loaded = pyqtSignal(object, str, QImage)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = set()
+        self._missing = set()
+        self._loaded.connect(self._on_loaded)
+
+    def pixmap(self, name, size):
+        """The thumbnail if ready, a null QPixmap if the product has no
+        image, or None while it is still loading."""
+        path = find_asset(name)
+        if path is None:
+            if name not in self._missing:
+                self._missing.add(name)
+                print(f"[WARN] Image not found for product '{name}' — looked for variants and extensions in assets/")
+            return QPixmap()
+        key = cache_key(path, size)
+        pixmap = get_pixmap_cache().find(key)
+        if pixmap is not None or key in self._pending:
+            return pixmap
+        self._pending.add(key)
+        QThreadPool.globalInstance().start(_ThumbnailJob(self, key, str(name).lower(), path, size))
+        return None
+
+    def _on_loaded(self, key, name, image):
+        self._pending.discard(key)
+        get_pixmap_cache().insert(key, QPixmap.fromImage(image))
+        self.thumbnail_ready.emit(name)
+
+
+_loader = None
+
+def get_thumbnail_loader():
+    global _loader
+    if _loader is None:
+        _loader = ThumbnailLoader()
+    return _loader
@@ -1,5 +1,20 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit
-from PyQt6.QtCore import QRect, QPropertyAnimation, QEasingCurve, Qt
+import os
+import time
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QLabel
+from PyQt6.QtCore import QRect, QPropertyAnimation, QEasingCurve, Qt, QObject, QEvent, QTimer
+
+from pixmap_cache import cached_pixmap
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKGROUND_PATH = os.path.join(BASE_DIR, 'assets', 'background_photo.png')
+# how long resizing must pause before the background is rescaled smoothly
+BACKGROUND_SETTLE_MS = int(os.getenv('SISIT_BACKGROUND_SETTLE_MS', '150'))
+# smoothly scaled backgrounds kept for the most recently used window sizes
+BACKGROUND_VARIANTS = 4
+# longest run_when_idle may hold the event loop per tick before letting it paint
+IDLE_SLICE_MS = 8
 
 
 def create_styled_line_edit(placeholder_text):
@@ -34,6 +49,92 @@ def create_menu_button():
     """)
     return collapse_btn
 
+def run_when_idle(owner, step, on_done=None):
+    """Call step() on idle event-loop ticks until it returns False, then
+    on_done(). Each tick stops after IDLE_SLICE_MS so input and painting
+    go on in between. Stops with owner if it is destroyed first; the
+    returned timer can be stopped to cancel."""
+    timer = QTimer(owner)
+    timer.setInterval(0)
+
+    def tick():
+        deadline = time.perf_counter() + IDLE_SLICE_MS / 1000
+        while time.perf_counter() < deadline:
+            if not step():
+                timer.stop()
+                timer.deleteLater()
+                if on_done is not None:
+                    on_done()
+                return
+
+    timer.timeout.connect(tick)
+    timer.start()
+    return timer
+
+_background_variants = OrderedDict()  # (path, width, height) -> QPixmap
+
+def _smooth_background(path, width, height):
+    key = (path, width, height)
+    pixmap = _background_variants.get(key)
+    if pixmap is not None:
+        _background_variants.move_to_end(key)
+        return pixmap
+    # every view scales from the one decoded source in the shared pixmap cache
+    pixmap = cached_pixmap(path).scaled(width, height, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                                        Qt.TransformationMode.SmoothTransformation)
+    _background_variants[key] = pixmap
+    while len(_background_variants) > BACKGROUND_VARIANTS:
+        _background_variants.popitem(last=False)
+    return pixmap
+
+class BackgroundRenderer(QObject):
+    """Shows an image behind widget, scaled to cover it and centred. While
+    the widget is being resized the last smooth frame is stretched with a
+    fast transform; the smooth rescale waits until resizing has settled."""
+
+    def __init__(self, widget, path=BACKGROUND_PATH):
+        super().__init__(widget)
+        self.widget = widget
+        self.path = path
+        self.label = QLabel(widget)
+        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents, True)
+        self.label.lower()
+        self._frame = None
+
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(BACKGROUND_SETTLE_MS)
+        self._settle_timer.timeout.connect(self.render_smooth)
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.widget and event.type() == QEvent.Type.Resize:
+            self.label.setGeometry(self.widget.rect())
+            size = event.size()
+            if self._frame is None or (self.path, size.width(), size.height()) in _background_variants:
+                # first layout, or a size seen before: nothing to wait for
+                self.render_smooth()
+            else:
+                self.render_fast()
+                self._settle_timer.start()
+        return False
+
+    def render_fast(self):
+        self.label.setPixmap(self._frame.scaled(self.widget.size(), Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                                                Qt.TransformationMode.FastTransformation))
+
+    def render_smooth(self):
+        self._settle_timer.stop()
+        size = self.widget.size()
+        if size.isEmpty():
+            return
+        frame = _smooth_background(self.path, size.width(), size.height())
+        if frame.isNull():
+            return
+        self._frame = frame
+        self.label.setPixmap(frame)
+
 class CollapsablePanel(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -3,15 +3,22 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, QTableWi
                              QMessageBox, QDialog, QTextEdit, QProgressBar, QGraphicsDropShadowEffect,
                              QCheckBox)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QFont, QColor, QPixmap
+from PyQt6.QtGui import QFont, QColor
 
-from ui_components import create_styled_line_edit, CollapsablePanel
+from ui_components import (create_styled_line_edit, CollapsablePanel, BackgroundRenderer, BACKGROUND_PATH,
+                           run_when_idle)
 from feedback_email import send_feedback_email
-from admin_auth import (get_admin_credentials, save_admin_credentials,
-                     remember_admin_login, get_remembered_admin, forget_admin_login)
+from admin_auth import (verify_admin_login, change_admin_credentials, has_permission, list_admins,
+                        add_admin, remove_admin, ROLES, ROLE_LABELS)
 from customer_auth import (get_customers_data, save_customer, verify_customer_login)
+from catalog import get_catalog
+from pixmap_cache import cached_pixmap
 import os, json
-from persistence import save_file_state, load_file_state, get_save_files
+from persistence import (save_file_state, load_file_state, restore_file_state, list_saves, count_saves,
+                         SAVE_DIR)
+from snapshot_diff import diff_snapshots, format_diff
+from datetime import datetime
+from itertools import islice
 
 def create_password_toggle_button(password_input):
     toggle_btn = QPushButton("⊙")
@@ -42,20 +49,12 @@ def _create_base_login_widget():
     return view_widget, layout
 
 def set_login_background(view_widget):
-    """Set background_photo.png with semi-transparent overlay so widgets remain visible."""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    bg_path = os.path.join(base_dir, "assets", "background_photo.png")
-    
-    if os.path.exists(bg_path):
-        view_widget.setStyleSheet(f"""
-            QWidget {{
-                background-image: url("{bg_path}");
-                background-position: center;
-                background-repeat: no-repeat;
-                background-attachment: fixed;
-                background-color: rgba(255, 255, 255, 0.7);
-            }}
-        """)
+    """Put background_photo.png behind the view, rescaled as the window resizes."""
+    if not os.path.exists(BACKGROUND_PATH):
+        print("Background image not found:", BACKGROUND_PATH)
+        return None
+    view_widget._background = BackgroundRenderer(view_widget)
+    return view_widget._background
 
 def create_customer_login_widget(parent=None):
     view_widget, layout = _create_base_login_widget()
@@ -143,7 +142,20 @@ def create_customer_login_widget(parent=None):
             QMessageBox.warning(view_widget, "Missing Info", "Please enter username and password.")
             return
 
-        success, profile, message = verify_customer_login(username, password)
+        # password hashing is slow on purpose; keep it off the GUI thread
+        login_btn.setEnabled(False)
+        worker = AuthWorker(verify_customer_login, username, password)
+        worker.finished.connect(lambda result: on_customer_login_checked(username, result))
+        view_widget.auth_worker = worker
+        worker.start()
+
+    def on_customer_login_checked(username, result):
+        login_btn.setEnabled(True)
+        if isinstance(result, Exception):
+            QMessageBox.critical(view_widget, "Login Failed", f"Could not check login:\n{str(result)}")
+            return
+
+        success, profile, message = result
         if success:
             if parent:
                 parent.active_user = {
@@ -153,6 +165,8 @@ def create_customer_login_widget(parent=None):
                     "age": profile["age"]
                 }
                 print("✅ Logged in customer:", parent.active_user)
+                parent.record_change("user", user=parent.active_user)
+                parent.start_session("customer", username, parent.active_user)
 
             if hasattr(parent, "switch_view"):
                 parent.switch_view("customer_catalog")
@@ -254,7 +268,18 @@ def create_customer_login_widget(parent=None):
                 return
             
             # Try to register
-            success, msg = save_customer(username, password, name, address, age)
+            register_confirm_btn.setEnabled(False)
+            worker = AuthWorker(save_customer, username, password, name, address, age)
+            worker.finished.connect(on_registered)
+            dialog.auth_worker = worker
+            worker.start()
+
+        def on_registered(result):
+            register_confirm_btn.setEnabled(True)
+            if isinstance(result, Exception):
+                QMessageBox.critical(dialog, "Registration Failed", f"Could not save account:\n{str(result)}")
+                return
+            success, msg = result
             if success:
                 QMessageBox.information(dialog, "Success", "Registration successful! You can now login.")
                 dialog.accept()
@@ -278,14 +303,10 @@ def create_customer_login_widget(parent=None):
     base_dir = os.path.dirname(os.path.abspath(__file__))
     icon_path = os.path.join(base_dir, "assets", "login_icon.png")
 
-    pixmap = QPixmap(icon_path)
+    pixmap = cached_pixmap(icon_path, 80)
 
     if not pixmap.isNull():
-        icon_label.setPixmap(
-            pixmap.scaled(80, 80,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation)
-        )
+        icon_label.setPixmap(pixmap)
     layout.addWidget(icon_label, alignment=Qt.AlignmentFlag.AlignCenter)
 
     layout.addSpacing(10)
@@ -306,9 +327,23 @@ def create_customer_login_widget(parent=None):
     layout.addSpacing(20)
     layout.addStretch(1)
 
+    def refresh_view():
+        # a kept login view comes back empty, as a new one would
+        username_input.clear()
+        password_input.clear()
+    view_widget.refresh_view = refresh_view
+
     return view_widget
 
+# rows beyond the visible ones to build ahead while scrolling the orders table
+ORDER_ROW_MARGIN = 50
+# inventory rows filled before the first frame; the rest follow on idle ticks
+STOCK_ROWS_FIRST = 50
+
 def create_inventory_widget(main_window):
+    # what the logged-in admin may do; see admin_auth.ROLE_PERMISSIONS
+    role = main_window.admin_role()
+
     view_widget = QWidget()
     layout = QVBoxLayout(view_widget)
     layout.setContentsMargins(20, 20, 20, 20)
@@ -334,13 +369,9 @@ def create_inventory_widget(main_window):
     base_dir = os.path.dirname(os.path.abspath(__file__))
     icon_path = os.path.join(base_dir, "assets", "login_icon.png")
 
-    pixmap = QPixmap(icon_path)
+    pixmap = cached_pixmap(icon_path, 80)
     if not pixmap.isNull():
-        icon_label.setPixmap(
-            pixmap.scaled(80, 80,
-                          Qt.AspectRatioMode.KeepAspectRatio,
-                          Qt.TransformationMode.SmoothTransformation)
-        )
+        icon_label.setPixmap(pixmap)
 
     #inventory table
     inventory_table = QTableWidget()
@@ -435,8 +466,14 @@ def create_inventory_widget(main_window):
         }
     """)
 
+    stock_fill = {'timer': None}
+
     def refresh_stocks():
         inventory = getattr(main_window, "inventory_data", {})
+        if stock_fill['timer'] is not None:
+            stock_fill['timer'].stop()
+            stock_fill['timer'].deleteLater()
+            stock_fill['timer'] = None
         inventory_table.blockSignals(True)
         inventory_table.setRowCount(len(inventory))
         inventory_table.setStyleSheet("""
@@ -444,104 +481,144 @@ def create_inventory_widget(main_window):
             QHeaderView::section { background-color: #f0f0f0; color: #000; font-weight: bold; }
         """)
 
-        for row, (prod_name, info) in enumerate(inventory.items()):
-            prod_type = info.get("type", "")
-            qty = int(info.get("quantity", 0))
-
-            # Fill cells
-            inventory_table.setItem(row, 0, QTableWidgetItem(prod_type))
-            inventory_table.setItem(row, 1, QTableWidgetItem(prod_name))
-            qty_item = QTableWidgetItem(str(qty))
-            inventory_table.setItem(row, 2, qty_item)
-
-            # Determine stock status color
-            if "Customized" in prod_name:
-                color = QColor("#6c757d")
-                status = "Customizable"
-            elif qty > 15:
-                color = QColor("#28a745")
-                status = "Good"
-            elif qty >= 5:
-                color = QColor("#ffc107")
-                status = "Low"
-            else:
-                color = QColor("#dc3545")
-                status = "Critical"
+        rows = enumerate(list(inventory.items()))
+        for row, (prod_name, info) in islice(rows, STOCK_ROWS_FIRST):
+            fill_stock_row(row, prod_name, info)
+        inventory_table.blockSignals(False)
 
-            status_item = QTableWidgetItem(status)
-            status_item.setBackground(color)
-            status_item.setForeground(QColor("white"))
+        def fill_next_row():
+            entry = next(rows, None)
+            if entry is None:
+                return False
+            row, (prod_name, info) = entry
+            inventory_table.blockSignals(True)
+            fill_stock_row(row, prod_name, info)
+            inventory_table.blockSignals(False)
+            return True
+
+        stock_fill['timer'] = run_when_idle(view_widget, fill_next_row, lambda: stock_fill.update(timer=None))
+
+    def fill_stock_row(row, prod_name, info):
+        prod_type = info.get("type", "")
+        qty = int(info.get("quantity", 0))
+
+        # Fill cells
+        inventory_table.setItem(row, 0, QTableWidgetItem(prod_type))
+        inventory_table.setItem(row, 1, QTableWidgetItem(prod_name))
+        qty_item = QTableWidgetItem(str(qty))
+        inventory_table.setItem(row, 2, qty_item)
+
+        # Determine stock status color
+        if not get_catalog().is_tracked(prod_name):
+            color = QColor("#6c757d")
+            status = "Customizable"
+        elif qty > 15:
+            color = QColor("#28a745")
+            status = "Good"
+        elif qty >= 5:
+            color = QColor("#ffc107")
+            status = "Low"
+        else:
+            color = QColor("#dc3545")
+            status = "Critical"
 
-            try:
-                status_item.setFlags(status_item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-            except Exception:
+        status_item = QTableWidgetItem(status)
+        status_item.setBackground(color)
+        status_item.setForeground(QColor("white"))
 
-                pass
-            inventory_table.setItem(row, 3, status_item)
+        try:
+            status_item.setFlags(status_item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
+        except Exception:
 
-        inventory_table.blockSignals(False)
+            pass
+        inventory_table.setItem(row, 3, status_item)
+
+    # order rows are built only once they scroll into view, so a long
+    # (lazily loaded) history is never materialized all at once
+    filled_order_rows = set()
 
     def refresh_orders():
         print("refresh_orders called")
         orders = getattr(main_window, "orders", []) or []
+        filled_order_rows.clear()
+        orders_table.clearContents()
         orders_table.setRowCount(len(orders))
-        for r, order in enumerate(orders):
-            buyer = order.get("buyer", {}) or {}
-            it0 = QTableWidgetItem(buyer.get("name", ""))
-            it1 = QTableWidgetItem(buyer.get("address", ""))
-            it2 = QTableWidgetItem(str(buyer.get("age", "")))
-            it3 = QTableWidgetItem(order.get("product", ""))
-            it4 = QTableWidgetItem(str(order.get("quantity", "")))
-            it5 = QTableWidgetItem(str(order.get("total", "")))
-
-            checkbox = QCheckBox()
-            checkbox.setStyleSheet("""
-                QCheckBox::indicator {
-                    width: 15px;
-                    height: 15px;
-                    border: 1px solid #888;
-                    border-radius: 3px;
-                }
-                QCheckBox::indicator:checked {
-                    background-color: #28a745;
-                    border: 1px solid #28a745;
-                }
-            """)
+        fill_visible_orders()
 
-            for it in (it0, it1, it2, it3, it4, it5):
-                try:
-                    it.setFlags(it.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                except Exception:
-                    pass
-            orders_table.setItem(r, 0, it0)
-            orders_table.setItem(r, 1, it1)
-            orders_table.setItem(r, 2, it2)
-            orders_table.setItem(r, 3, it3)
-            orders_table.setItem(r, 4, it4)
-            orders_table.setItem(r, 5, it5)
-
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            checkbox_layout.setContentsMargins(0, 0, 0, 0)
-            checkbox_layout.addWidget(checkbox, alignment=Qt.AlignmentFlag.AlignCenter)
-            orders_table.setCellWidget(r, 6, checkbox_widget)
-
-
-            def make_toggle_handler(row_idx):
-                def on_checkbox_toggled(checked):
-                    for col in range(6):
-                        item = orders_table.item(row_idx, col)
-                        if item:
-                            if checked:
-                                font = item.font()
-                                font.setStrikeOut(True)
-                                item.setFont(font)
-                            else:
-                                font = item.font()
-                                font.setStrikeOut(False)
-                                item.setFont(font)
-                return on_checkbox_toggled
-            checkbox.stateChanged.connect(make_toggle_handler(r))
+    def fill_visible_orders():
+        orders = getattr(main_window, "orders", []) or []
+        row_count = orders_table.rowCount()
+        if not row_count:
+            return
+        first = max(orders_table.rowAt(0), 0)
+        last = orders_table.rowAt(orders_table.viewport().height())
+        if last < 0:
+            last = row_count - 1
+        last = min(max(last + ORDER_ROW_MARGIN, first + ORDER_ROW_MARGIN), row_count - 1)
+        for r in range(first, last + 1):
+            if r not in filled_order_rows and r < len(orders):
+                fill_order_row(r, orders[r])
+                filled_order_rows.add(r)
+
+    def fill_order_row(r, order):
+        buyer = order.get("buyer", {}) or {}
+        it0 = QTableWidgetItem(buyer.get("name", ""))
+        it1 = QTableWidgetItem(buyer.get("address", ""))
+        it2 = QTableWidgetItem(str(buyer.get("age", "")))
+        it3 = QTableWidgetItem(order.get("product", ""))
+        it4 = QTableWidgetItem(str(order.get("quantity", "")))
+        it5 = QTableWidgetItem(str(order.get("total", "")))
+
+        checkbox = QCheckBox()
+        checkbox.setStyleSheet("""
+            QCheckBox::indicator {
+                width: 15px;
+                height: 15px;
+                border: 1px solid #888;
+                border-radius: 3px;
+            }
+            QCheckBox::indicator:checked {
+                background-color: #28a745;
+                border: 1px solid #28a745;
+            }
+        """)
+
+        for it in (it0, it1, it2, it3, it4, it5):
+            try:
+                it.setFlags(it.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            except Exception:
+                pass
+        orders_table.setItem(r, 0, it0)
+        orders_table.setItem(r, 1, it1)
+        orders_table.setItem(r, 2, it2)
+        orders_table.setItem(r, 3, it3)
+        orders_table.setItem(r, 4, it4)
+        orders_table.setItem(r, 5, it5)
+
+        checkbox_widget = QWidget()
+        checkbox_layout = QHBoxLayout(checkbox_widget)
+        checkbox_layout.setContentsMargins(0, 0, 0, 0)
+        checkbox_layout.addWidget(checkbox, alignment=Qt.AlignmentFlag.AlignCenter)
+        orders_table.setCellWidget(r, 6, checkbox_widget)
+
+
+        def make_toggle_handler(row_idx):
+            def on_checkbox_toggled(checked):
+                for col in range(6):
+                    item = orders_table.item(row_idx, col)
+                    if item:
+                        if checked:
+                            font = item.font()
+                            font.setStrikeOut(True)
+                            item.setFont(font)
+                        else:
+                            font = item.font()
+                            font.setStrikeOut(False)
+                            item.setFont(font)
+            return on_checkbox_toggled
+        checkbox.stateChanged.connect(make_toggle_handler(r))
+
+    orders_table.verticalScrollBar().valueChanged.connect(lambda value: fill_visible_orders())
 
     # Buttons
     button_layout = QHBoxLayout()
@@ -558,12 +635,16 @@ def create_inventory_widget(main_window):
     load_btn = QPushButton("Load State")
     load_btn.setStyleSheet("background: #6c757d; color: white; border-radius: 5px; padding: 5px 10px;")
 
+    compare_btn = QPushButton("Compare Saves")
+    compare_btn.setStyleSheet("background: #6c757d; color: white; border-radius: 5px; padding: 5px 10px;")
+
     restock_btn = QPushButton("Restock Selected")
     restock_btn.setStyleSheet("background: #28a745; color: white; border-radius: 5px; padding: 5px 10px;")
 
     button_layout.addWidget(refresh_btn)
     button_layout.addWidget(save_btn)
     button_layout.addWidget(load_btn)
+    button_layout.addWidget(compare_btn)
     button_layout.addWidget(restock_btn)
 
     # Add widgets
@@ -600,11 +681,13 @@ def create_inventory_widget(main_window):
         for r in sorted(rows_to_remove, reverse=True):
             if r < len(orders):
                 orders.pop(r)
+        main_window.record_change("orders_remove", indexes=rows_to_remove)
         
         refresh_orders()
         QMessageBox.information(view_widget, "Removed", f"Removed {len(rows_to_remove)} completed order(s).")
     
     remove_completed_btn.clicked.connect(remove_completed_orders)
+    remove_completed_btn.setEnabled(has_permission(role, "manage_orders"))
     orders_button_layout.addWidget(remove_completed_btn)
     
     layout.addLayout(orders_button_layout)
@@ -648,26 +731,23 @@ def create_inventory_widget(main_window):
             save_btn.setStyleSheet("background: #222222; color: white; border-radius: 5px; padding: 5px;")
             
             def save_changes():
-                credentials = get_admin_credentials()
-                if credentials.get(old_username.text()) != old_password.text():
-                    QMessageBox.warning(self, "Error", "Current credentials are incorrect")
+                save_btn.setEnabled(False)
+                self.auth_worker = AuthWorker(change_admin_credentials, old_username.text(), old_password.text(),
+                                              new_username.text(), new_password.text())
+                self.auth_worker.finished.connect(on_saved)
+                self.auth_worker.start()
+
+            def on_saved(result):
+                save_btn.setEnabled(True)
+                if isinstance(result, Exception):
+                    QMessageBox.critical(self, "Error", f"Failed to update credentials: {str(result)}")
                     return
-                
-                if not new_username.text() or not new_password.text():
-                    QMessageBox.warning(self, "Error", "New credentials cannot be empty")
-                    return
-                
-                # Check if old and new credentials are the same
-                if old_username.text() == new_username.text() and old_password.text() == new_password.text():
-                    QMessageBox.warning(self, "Error", "New credentials cannot be the same as old credentials")
-                    return
-                
-                try:
-                    save_admin_credentials(new_username.text(), new_password.text())
-                    QMessageBox.information(self, "Success", "Credentials updated successfully")
+                success, message = result
+                if success:
+                    QMessageBox.information(self, "Success", message)
                     self.accept()
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to update credentials: {str(e)}")
+                else:
+                    QMessageBox.warning(self, "Error", message)
             
             save_btn.clicked.connect(save_changes)
             
@@ -683,10 +763,12 @@ def create_inventory_widget(main_window):
     def change_credentials():
         dialog = ChangeCredentialsDialog(view_widget)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            main_window.switch_view('admin')
+            main_window.log_out('admin')
     
     settings_panel.add_menu_item("Change Credentials", change_credentials)
-    settings_panel.add_menu_item("Log Out", lambda: main_window.switch_view('admin'))
+    if has_permission(role, "manage_admins"):
+        settings_panel.add_menu_item("Manage Admins", lambda: ManageAdminsDialog(view_widget).exec())
+    settings_panel.add_menu_item("Log Out", lambda: main_window.log_out('admin'))
 
     settings_btn = QPushButton("☰")
     settings_btn.setFixedSize(30, 30)
@@ -737,64 +819,14 @@ def create_inventory_widget(main_window):
                     return
 
                 inv[prod_name]["quantity"] = max_stock
+                main_window.record_change("stock", product=prod_name, quantity=max_stock)
 
-                if hasattr(main_window, 'product_card_map'):
-                    card = main_window.product_card_map.get(prod_name)
-                    if card:
-                        if hasattr(card, 'buy_btn'):
-                            card.buy_btn.setEnabled(True)
-                            card.buy_btn.setText("Add to Cart")
-                        if hasattr(card, 'name_label'):
-                            qty = inv[prod_name]["quantity"]
-                            card.name_label.setText(f"{inv[prod_name].get('type', '')}: {prod_name} - {qty} left")
+                main_window.update_product_card_display(prod_name)
 
             refresh_stocks()
             QMessageBox.information(view_widget, "Restock Complete", 
                                   f"{prod_name} has been restocked.")
 
-    def save_current_state():
-        try:
-            filename = save_file_state(
-                main_window.inventory_data,
-                main_window.orders,
-                main_window.active_user,
-                main_window.cart_items
-            )
-            QMessageBox.information(view_widget, "Save Complete",
-                                  f"File state saved to:\n{os.path.basename(filename)}")
-        except Exception as e:
-            QMessageBox.warning(view_widget, "Save Failed",
-                              f"Could not save file state:\n{str(e)}")
-    
-    def load_saved_state():
-        try:
-            files = get_save_files()
-            if not files:
-                QMessageBox.information(view_widget, "No Saves",
-                                      "No saved files found.")
-                return
-            
-            state = load_file_state(files[0])
-            if not state:
-                QMessageBox.warning(view_widget, "Load Failed",
-                                  "Could not load the save file.")
-                return
-            
-            # Update main window state
-            main_window.inventory_data = state['inventory']
-            main_window.orders = state['orders']
-            if 'cart_items' in state:
-                main_window.cart_items = state['cart_items']
-            
-            refresh_stocks()
-            refresh_orders()
-            
-            QMessageBox.information(view_widget, "Load Complete",
-                                  "File state loaded successfully!")
-        except Exception as e:
-            QMessageBox.warning(view_widget, "Load Failed",
-                              f"Error loading file state:\n{str(e)}")
-
     def on_table_cell_changed(row, column):
 
         if column == 2:
@@ -810,6 +842,7 @@ def create_inventory_widget(main_window):
                     qty_val = 0
                 if inv is not None and prod_name:
                     inv.setdefault(prod_name, {})["quantity"] = qty_val
+                    main_window.record_change("stock", product=prod_name, quantity=qty_val)
                 # update status
                 status_text = colorize_quantity_item(item)
                 inventory_table.setItem(row, 3, QTableWidgetItem(status_text))
@@ -826,16 +859,25 @@ def create_inventory_widget(main_window):
         except Exception as e:
             QMessageBox.critical(view_widget, "Error", f"Could not save file state:\n{str(e)}")
 
+    def apply_state(state):
+        main_window.inventory_data = state.get('inventory', {})
+        main_window.orders = state.get('orders', [])
+        main_window.active_user = state.get('active_user')
+        main_window.cart_items = state.get('cart_items', [])
+        refresh_stocks()
+        refresh_orders()
+
     def load_saved_state():
+        dialog = SaveBrowserDialog(view_widget)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
         try:
-            state = load_file_state()
+            if dialog.selected_path:
+                state = restore_file_state(dialog.selected_path, lazy_orders=True)
+            else:
+                state = load_file_state(lazy_orders=True)
             if state:
-                main_window.inventory_data = state.get('inventory', {})
-                main_window.orders = state.get('orders', [])
-                main_window.active_user = state.get('active_user')
-                main_window.cart_items = state.get('cart_items', [])
-                refresh_stocks()
-                refresh_orders()
+                apply_state(state)
                 QMessageBox.information(view_widget, "Success", "State loaded successfully")
             else:
                 QMessageBox.warning(view_widget, "No Save File", "No saved state found")
@@ -845,11 +887,23 @@ def create_inventory_widget(main_window):
     restock_btn.clicked.connect(restock_selected)
     save_btn.clicked.connect(save_current_state)
     load_btn.clicked.connect(load_saved_state)
+    restock_btn.setEnabled(has_permission(role, "restock"))
+    save_btn.setEnabled(has_permission(role, "manage_saves"))
+    load_btn.setEnabled(has_permission(role, "manage_saves"))
+    compare_btn.clicked.connect(lambda: CompareSavesDialog(view_widget).exec())
     inventory_table.cellChanged.connect(on_table_cell_changed)
 
     refresh_stocks()
     refresh_orders()
 
+    def refresh_view():
+        # buttons and menu items were chosen for the role; another admin needs a new view
+        if main_window.admin_role() != role:
+            return False
+        refresh_stocks()
+        refresh_orders()
+    view_widget.refresh_view = refresh_view
+
     return view_widget
 
 
@@ -905,6 +959,7 @@ def create_admin_login_widget(main_window):
     remember_checkbox.setStyleSheet("""
         QCheckBox {
             color: #222222;
+            background: transparent;
         }
         QCheckBox::indicator {
             width: 15px;
@@ -927,22 +982,25 @@ def create_admin_login_widget(main_window):
     username_input.returnPressed.connect(login_btn.click)
     password_input.returnPressed.connect(login_btn.click)
 
-    remembered = get_remembered_admin()
-    if remembered and remembered.get("username") and remembered.get("password"):
-        username_input.setText(remembered["username"])
-        password_input.setText(remembered["password"])
-        remember_checkbox.setChecked(True)
-
     def handle_admin_login():
         username = username_input.text()
         password = password_input.text()
-        credentials = get_admin_credentials()
 
-        if credentials.get(username) == password:
-            if remember_checkbox.isChecked():
-                remember_admin_login(username, password)
-            else:
-                forget_admin_login()
+        login_btn.setEnabled(False)
+        worker = AuthWorker(verify_admin_login, username, password)
+        worker.finished.connect(lambda result: on_admin_login_checked(username, result))
+        view_widget.auth_worker = worker
+        worker.start()
+
+    def on_admin_login_checked(username, result):
+        login_btn.setEnabled(True)
+        if isinstance(result, Exception):
+            QMessageBox.critical(view_widget, "Login Failed", f"Could not check login:\n{str(result)}")
+            return
+
+        if result:
+            # a remembered session survives a restart; the password is never stored
+            main_window.start_session('admin', username, {"role": result}, remember=remember_checkbox.isChecked())
             main_window.switch_view('inventory')
         else:
             msg_box = QMessageBox(view_widget)
@@ -963,14 +1021,10 @@ def create_admin_login_widget(main_window):
     base_dir = os.path.dirname(os.path.abspath(__file__))
     icon_path = os.path.join(base_dir, "assets", "login_icon.png")
 
-    pixmap = QPixmap(icon_path)
+    pixmap = cached_pixmap(icon_path, 80)
 
     if not pixmap.isNull():
-        icon_label.setPixmap(
-            pixmap.scaled(80, 80,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation)
-        )
+        icon_label.setPixmap(pixmap)
     layout.addWidget(icon_label, alignment=Qt.AlignmentFlag.AlignCenter)
 
     layout.addSpacing(10)
@@ -985,10 +1039,257 @@ def create_admin_login_widget(main_window):
     layout.addWidget(remember_checkbox, alignment=Qt.AlignmentFlag.AlignCenter)
     layout.addStretch(1)
 
+    def refresh_view():
+        username_input.clear()
+        password_input.clear()
+        remember_checkbox.setChecked(False)
+    view_widget.refresh_view = refresh_view
+
     return view_widget
 
 
 
+class SaveBrowserDialog(QDialog):
+    PAGE_SIZE = 100
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Saved States")
+        self.resize(640, 420)
+        self.selected_path = None
+        self.loaded = 0
+        self.total = count_saves()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(10)
+
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
+
+        # rows come from the manifest summaries, one page at a time
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["Saved At", "Products", "Orders", "Total Stock", "Size"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.table.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        self.table.cellDoubleClicked.connect(lambda row, col: self.restore_selected())
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+
+        latest_btn = QPushButton("Load Latest")
+        latest_btn.setStyleSheet("background: #6c757d; color: white; border-radius: 5px; padding: 5px 10px;")
+        latest_btn.clicked.connect(self.accept)
+
+        restore_btn = QPushButton("Restore Selected")
+        restore_btn.setStyleSheet("background: #28a745; color: white; border-radius: 5px; padding: 5px 10px;")
+        restore_btn.clicked.connect(self.restore_selected)
+
+        button_layout.addWidget(latest_btn)
+        button_layout.addWidget(restore_btn)
+        layout.addLayout(button_layout)
+
+        self.load_page()
+
+    def load_page(self):
+        entries = list_saves(self.loaded, self.PAGE_SIZE)
+        row = self.table.rowCount()
+        self.table.setRowCount(row + len(entries))
+        for entry in entries:
+            summary = entry.get('summary', {})
+            saved_at = entry.get('saved_at') or ''
+            try:
+                saved_at = datetime.strptime(saved_at, '%Y%m%d_%H%M%S').strftime('%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                pass
+            saved_item = QTableWidgetItem(saved_at)
+            saved_item.setData(Qt.ItemDataRole.UserRole, entry['file'])
+            self.table.setItem(row, 0, saved_item)
+            self.table.setItem(row, 1, QTableWidgetItem(str(summary.get('products', ''))))
+            self.table.setItem(row, 2, QTableWidgetItem(str(summary.get('orders', ''))))
+            self.table.setItem(row, 3, QTableWidgetItem(str(summary.get('total_stock', ''))))
+            self.table.setItem(row, 4, QTableWidgetItem(f"{entry.get('size', 0) / 1024:.1f} KB"))
+            row += 1
+        self.loaded += len(entries)
+        self.count_label.setText(f"Showing {self.loaded} of {self.total} saves")
+
+    def on_scroll(self, value):
+        if value >= self.table.verticalScrollBar().maximum() and self.loaded < self.total:
+            self.load_page()
+
+    def restore_selected(self):
+        item = self.table.item(self.table.currentRow(), 0)
+        if not item:
+            QMessageBox.information(self, "No Selection", "Please select a save to restore.")
+            return
+        self.selected_path = os.path.join(SAVE_DIR, item.data(Qt.ItemDataRole.UserRole))
+        self.accept()
+
+
+class CompareSavesDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Compare Saves")
+        self.resize(640, 480)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(10)
+
+        self.old_combo = QComboBox()
+        self.new_combo = QComboBox()
+        for entry in list_saves(0, count_saves()):
+            saved_at = entry.get('saved_at') or entry['file']
+            try:
+                saved_at = datetime.strptime(saved_at, '%Y%m%d_%H%M%S').strftime('%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                pass
+            label = f"{saved_at}  ({entry.get('summary', {}).get('orders', '?')} orders)"
+            self.old_combo.addItem(label, entry['file'])
+            self.new_combo.addItem(label, entry['file'])
+        # newest first: compare the previous save against the latest one
+        self.old_combo.setCurrentIndex(min(1, self.old_combo.count() - 1))
+
+        pick_layout = QHBoxLayout()
+        pick_layout.addWidget(QLabel("From:"))
+        pick_layout.addWidget(self.old_combo, 1)
+        pick_layout.addWidget(QLabel("To:"))
+        pick_layout.addWidget(self.new_combo, 1)
+        layout.addLayout(pick_layout)
+
+        self.result_text = QTextEdit()
+        self.result_text.setReadOnly(True)
+        layout.addWidget(self.result_text)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        compare_btn = QPushButton("Compare")
+        compare_btn.setStyleSheet("background: #0078d7; color: white; border-radius: 5px; padding: 5px 10px;")
+        compare_btn.clicked.connect(self.compare)
+        button_layout.addWidget(compare_btn)
+        layout.addLayout(button_layout)
+
+    def compare(self):
+        old_file, new_file = self.old_combo.currentData(), self.new_combo.currentData()
+        if not old_file or not new_file:
+            QMessageBox.information(self, "No Saves", "There are no saves to compare.")
+            return
+        try:
+            diff = diff_snapshots(os.path.join(SAVE_DIR, old_file), os.path.join(SAVE_DIR, new_file))
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Could not compare saves:\n{str(e)}")
+            return
+        self.result_text.setPlainText("\n".join(format_diff(diff)))
+
+
+class ManageAdminsDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Manage Admins")
+        self.resize(420, 420)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(10)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(2)
+        self.table.setHorizontalHeaderLabels(["Username", "Role"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        layout.addWidget(self.table)
+
+        remove_btn = QPushButton("Remove Selected")
+        remove_btn.setStyleSheet("background: #dc3545; color: white; border-radius: 5px; padding: 5px 10px;")
+        remove_btn.clicked.connect(self.remove_selected)
+        layout.addWidget(remove_btn, alignment=Qt.AlignmentFlag.AlignRight)
+
+        self.username_input = QLineEdit(self)
+        self.username_input.setPlaceholderText("New Username")
+        self.password_input = QLineEdit(self)
+        self.password_input.setPlaceholderText("Password")
+        self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
+        self.role_combo = QComboBox()
+        for role in ROLES:
+            self.role_combo.addItem(ROLE_LABELS[role], role)
+
+        self.add_btn = QPushButton("Add Admin")
+        self.add_btn.setStyleSheet("background: #28a745; color: white; border-radius: 5px; padding: 5px 10px;")
+        self.add_btn.clicked.connect(self.add_selected)
+
+        layout.addWidget(self.username_input)
+        layout.addWidget(self.password_input)
+        layout.addWidget(self.role_combo)
+        layout.addWidget(self.add_btn)
+
+        self.refresh()
+
+    def refresh(self):
+        admins = list_admins()
+        self.table.setRowCount(len(admins))
+        for row, (username, role) in enumerate(admins):
+            self.table.setItem(row, 0, QTableWidgetItem(username))
+            self.table.setItem(row, 1, QTableWidgetItem(ROLE_LABELS.get(role, role or "")))
+
+    def add_selected(self):
+        self.add_btn.setEnabled(False)
+        self.auth_worker = AuthWorker(add_admin, self.username_input.text().strip(), self.password_input.text(),
+                                      self.role_combo.currentData())
+        self.auth_worker.finished.connect(self.on_added)
+        self.auth_worker.start()
+
+    def on_added(self, result):
+        self.add_btn.setEnabled(True)
+        if isinstance(result, Exception):
+            QMessageBox.critical(self, "Error", f"Failed to add admin: {str(result)}")
+            return
+        success, message = result
+        if not success:
+            QMessageBox.warning(self, "Error", message)
+            return
+        self.username_input.clear()
+        self.password_input.clear()
+        self.refresh()
+
+    def remove_selected(self):
+        item = self.table.item(self.table.currentRow(), 0)
+        if not item:
+            QMessageBox.information(self, "No Selection", "Please select an admin to remove.")
+            return
+        try:
+            success, message = remove_admin(item.text())
+        except OSError as e:
+            success, message = False, str(e)
+        if not success:
+            QMessageBox.warning(self, "Error", message)
+        self.refresh()
+
+
+class AuthWorker(QThread):
+    """Runs a login or registration call, with its password hashing, off the GUI thread."""
+    finished = pyqtSignal(object)
+
+    def __init__(self, func, *args):
+        super().__init__()
+        self.func = func
+        self.args = args
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            # handed to the GUI thread as the result; raising here would leave the form waiting
+            result = e
+        self.finished.emit(result)
+
+
 class FeedbackSender(QThread):
     finished = pyqtSignal(bool, str)
 
@@ -0,0 +1,64 @@
+import os
+from collections import OrderedDict
+
+# constructed views kept alive for instant switching; 0 builds every view afresh
+VIEW_POOL_SIZE = int(os.getenv('SISIT_VIEW_POOL_SIZE', '4'))
+
+
+def release(view):
+    """Destroy a view once control returns to the event loop, first calling
+    its release_view() hook, if it has one, to drop references held elsewhere."""
+    hook = getattr(view, 'release_view', None)
+    if hook is not None:
+        hook()
+    view.deleteLater()
+
+
+class ViewPool:
+    """Constructed views by name, so switching back to one reuses it rather
+    than building it again. Past `size` views the least recently shown is
+    destroyed. A view may set a refresh_view() attribute, called each time
+    it is shown again, to catch up with data that changed while it was
+    hidden; returning False from it has the view rebuilt instead."""
+
+    def __init__(self, creators, size=VIEW_POOL_SIZE, transient=()):
+        self.creators = creators
+        self.size = size
+        # built fresh every time and never kept, e.g. the splash
+        self.transient = set(transient)
+        self._views = OrderedDict()  # name -> view, least recently shown first
+
+    def __len__(self):
+        return len(self._views)
+
+    def __contains__(self, name):
+        return name in self._views
+
+    def keeps(self, view):
+        return any(kept is view for kept in self._views.values())
+
+    def get(self, name, parent):
+        view = self._views.pop(name, None)
+        if view is not None:
+            refresh = getattr(view, 'refresh_view', None)
+            if refresh is not None and refresh() is False:
+                release(view)
+                view = None
+        if view is None:
+            view = self.creators[name](parent)
+        if name not in self.transient and self.size > 0:
+            self._views[name] = view
+            while len(self._views) > self.size:
+                _, evicted = self._views.popitem(last=False)
+                release(evicted)
+        return view
+
+    def discard(self, name):
+        """Drop a kept view so the next switch to it builds a new one."""
+        view = self._views.pop(name, None)
+        if view is not None:
+            release(view)
+
+    def clear(self):
+        for name in list(self._views):
+            self.discard(name)